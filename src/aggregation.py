@@ -0,0 +1,239 @@
+import logging
+import random
+from array import array
+from multiprocessing import Pool, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.main import build_result, create_simulation
+from src.models.student import Student
+from src.observers import SimulationObserver
+
+
+# Per-replication arrays shipped through shared memory, with their dtypes
+SAMPLE_DTYPES = {
+    "wait_times": np.float64,
+    "service_times": np.float64,
+    "queue_lengths": np.int64,
+}
+
+# Control message describing one shared array: block name and number of elements
+BlockInfo = Tuple[str, int]
+
+
+class SampleCollector(SimulationObserver):
+    """
+    Collects per-student samples into compact typed arrays instead of Student objects.
+    """
+
+    def __init__(self) -> None:
+        self.wait_times = array("d")
+        self.service_times = array("d")
+        self.queue_lengths = array("q")
+
+    def on_service_start(self, simulation, student: Student) -> None:
+        self.wait_times.append(student.service_start_time - student.arrival_time)
+        self.service_times.append(student.service_time)
+
+    def on_queue_change(self, simulation, queue_length: int) -> None:
+        self.queue_lengths.append(queue_length)
+
+
+def _to_shared_memory(samples: array, dtype) -> BlockInfo:
+    """
+    Copy samples into a new shared memory block, left open for the parent to attach.
+
+    :param samples: Samples to copy.
+    :param dtype: NumPy dtype of the samples.
+    :return: Name of the block and number of samples.
+    """
+    source = np.frombuffer(samples, dtype=dtype) if len(samples) else np.empty(0, dtype=dtype)
+    block = SharedMemory(create=True, size=max(source.nbytes, 1))
+    try:
+        np.ndarray(source.shape, dtype=dtype, buffer=block.buf)[:] = source
+    except Exception:
+        block.unlink()
+        raise
+    finally:
+        block.close()
+    return block.name, len(source)
+
+
+def _release_blocks(blocks: Dict[str, BlockInfo]) -> None:
+    """
+    Unlink shared memory blocks that will not reach the parent.
+    """
+    for block_name, _ in blocks.values():
+        block = SharedMemory(name=block_name)
+        block.close()
+        block.unlink()
+
+
+def _run_replication(name: str, setup: Any, iteration: int, config_path: Path, overrides: Optional[Dict],
+                     seed: int) -> Tuple[Dict, Dict[str, BlockInfo]]:
+    """
+    Run one replication in a worker process and publish its samples through shared memory.
+
+    A failing replication is logged and reported with an "error" summary and no blocks;
+    blocks it already created are released, so none outlive the sweep.
+
+    :return: Summary of the replication and the shared blocks holding its samples.
+    """
+    blocks: Dict[str, BlockInfo] = {}
+    try:
+        random.seed(seed)
+        np.random.seed(seed)
+        collector = SampleCollector()
+        simulation = create_simulation(setup, config_path, overrides=overrides, observers=[collector])
+        simulation.run()
+
+        summary = build_result(
+            name, iteration, simulation,
+            float(np.mean(collector.wait_times)) if collector.wait_times else 0,
+            float(np.mean(collector.service_times)) if collector.service_times else 0
+        )
+        for key, dtype in SAMPLE_DTYPES.items():
+            blocks[key] = _to_shared_memory(getattr(collector, key), dtype)
+        return summary, blocks
+    except Exception as e:
+        logging.error(f"Error during iteration {iteration} for setup {name}: {e}")
+        _release_blocks(blocks)
+        return {"name": name, "iteration": iteration, "error": str(e)}, {}
+
+
+def _run_replication_star(arguments: Tuple) -> Tuple[Dict, Dict[str, BlockInfo]]:
+    return _run_replication(*arguments)
+
+
+class SharedReplicationResults:
+    """
+    Per-replication samples held in shared memory blocks written by worker processes.
+
+    The blocks stay mapped until close() is called, which also releases them. Use
+    the object as a context manager to release the blocks automatically.
+    """
+
+    def __init__(self) -> None:
+        self.rows: List[Dict] = []
+        self._blocks: List[SharedMemory] = []
+        self._samples: Dict[str, List[np.ndarray]] = {key: [] for key in SAMPLE_DTYPES}
+
+    def add(self, summary: Dict, blocks: Dict[str, BlockInfo]) -> None:
+        """
+        Attach the shared blocks of a finished replication.
+
+        :param summary: Summary of the replication.
+        :param blocks: Block name and sample count for every sample array.
+        """
+        self.rows.append(summary)
+        for key, (block_name, length) in blocks.items():
+            block = SharedMemory(name=block_name)
+            self._blocks.append(block)
+            self._samples[key].append(np.ndarray((length,), dtype=SAMPLE_DTYPES[key], buffer=block.buf))
+
+    def sort(self) -> None:
+        """
+        Order replications, and their samples, by iteration.
+        """
+        order = sorted(range(len(self.rows)), key=lambda index: self.rows[index]["iteration"])
+        self.rows = [self.rows[index] for index in order]
+        self._samples = {key: [samples[index] for index in order] for key, samples in self._samples.items()}
+
+    def count(self, key: str = "wait_times") -> int:
+        """
+        Get the number of samples over all replications.
+        """
+        return sum(len(samples) for samples in self._samples[key])
+
+    def mean(self, key: str = "wait_times") -> float:
+        """
+        Get the mean of the samples pooled over all replications, reduced block by block.
+        """
+        total = self.count(key)
+        return sum(float(samples.sum()) for samples in self._samples[key]) / total if total else 0.0
+
+    def maximum(self, key: str = "wait_times") -> float:
+        """
+        Get the largest sample over all replications.
+        """
+        return max((float(samples.max()) for samples in self._samples[key] if len(samples)), default=0.0)
+
+    def replication_means(self, key: str = "wait_times") -> np.ndarray:
+        """
+        Get the mean of the samples of every replication, in the order of rows.
+        """
+        return np.array([samples.mean() if len(samples) else 0.0 for samples in self._samples[key]])
+
+    def percentiles(self, q: Sequence[float], key: str = "wait_times") -> np.ndarray:
+        """
+        Get percentiles of the samples pooled over all replications.
+
+        :param q: Percentiles to compute, between 0 and 100.
+        :param key: Sample array, one of SAMPLE_DTYPES.
+        :return: The percentiles.
+        """
+        if not self.count(key):
+            return np.zeros(len(q))
+        return np.percentile(np.concatenate(self._samples[key]), q)
+
+    def close(self) -> None:
+        """
+        Drop the array views and release all shared memory blocks.
+        """
+        self._samples = {key: [] for key in SAMPLE_DTYPES}
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "SharedReplicationResults":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def run_replications_shared(name: str, setup: Any, iterations: int, config_path: Path,
+                            overrides: Optional[Dict] = None, seed: Optional[int] = None,
+                            processes: Optional[int] = None) -> SharedReplicationResults:
+    """
+    Run replications of a setup in worker processes, aggregating their samples through shared memory.
+
+    Only replication summaries and block names are pickled between processes; the
+    per-student samples are written once by the worker and read in place by the parent.
+    Failed replications are logged and skipped, as in run_simulations_with_setup.
+
+    :param name: Name of the simulation setup.
+    :param setup: Configuration for employees and deanery.
+    :param iterations: Number of replications.
+    :param config_path: Path to the configuration JSON file.
+    :param overrides: Configuration values replacing those from the file (e.g. "lambda", "mu").
+    :param seed: Base seed from which the replication seeds are derived.
+    :param processes: Number of worker processes, defaults to the number of CPUs.
+    :return: Results holding the shared samples; close them when done.
+    """
+    # Workers must share the parent's resource tracker, or blocks could be released when a worker exits
+    resource_tracker.ensure_running()
+
+    seeds = np.random.SeedSequence(seed).generate_state(iterations)
+    tasks = [
+        (name, setup, iteration, config_path, overrides, int(seeds[iteration - 1]))
+        for iteration in range(1, iterations + 1)
+    ]
+
+    results = SharedReplicationResults()
+    try:
+        with Pool(processes=processes) as pool:
+            for summary, blocks in pool.imap_unordered(_run_replication_star, tasks):
+                if "error" in summary:
+                    continue
+                logging.info(f"Finished iteration {summary['iteration']} for setup {name}")
+                results.add(summary, blocks)
+    except Exception:
+        results.close()
+        raise
+    results.sort()
+    return results
@@ -0,0 +1,340 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.main import RESULT_FIELDS, get_employee_setups, get_path, run_single_simulation
+
+
+# Task states
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    setup TEXT NOT NULL,
+    overrides TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    seed INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    task_id TEXT PRIMARY KEY REFERENCES tasks (task_id),
+    worker TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    result TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class Task:
+    """
+    A single simulation replication claimed from the work queue.
+
+    Attributes:
+        task_id (str): Unique identifier of the replication.
+        name (str): Name of the simulation setup.
+        setup (Any): Configuration for employees and deanery.
+        overrides (Dict): Configuration values replacing those from the file.
+        iteration (int): Number of the replication within its setup.
+        seed (int): Seed of the replication, reused when the task is retried.
+    """
+    task_id: str
+    name: str
+    setup: Any
+    overrides: Dict
+    iteration: int
+    seed: int
+
+
+class WorkQueue:
+    """
+    SQLite-backed queue of simulation replications shared by a coordinator and workers.
+
+    The database file may live on a shared filesystem. Workers claim tasks with a
+    time-limited lease; tasks whose lease expires are handed out again. Results are
+    keyed by task, so a late or repeated completion of the same task is ignored.
+    """
+
+    def __init__(self, path: Path, lease_seconds: float = 300.0, max_attempts: int = 3) -> None:
+        """
+        :param path: Path to the SQLite database file, created if missing.
+        :param lease_seconds: How long a claimed task stays reserved for its worker.
+        :param max_attempts: Number of claims after which a failing task is given up.
+        """
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        connection = sqlite3.connect(self.path, timeout=60)
+        try:
+            connection.executescript(SCHEMA)
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _transaction(self, write: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Open a connection running the block in a single transaction.
+
+        :param write: If True, take the database write lock up front so that
+                      concurrent claims cannot interleave.
+        """
+        connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            connection.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield connection
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def submit(self, name: str, setup: Any, iterations: int, overrides: Optional[Dict] = None,
+               seed: Optional[int] = None) -> List[str]:
+        """
+        Add replications of a setup to the queue. Submitting the same replications again has no effect.
+
+        :param name: Name of the simulation setup.
+        :param setup: Configuration for employees and deanery.
+        :param iterations: Number of replications.
+        :param overrides: Configuration values replacing those from the file (e.g. "lambda", "mu").
+        :param seed: Base seed; replication seeds are derived from it and the task id.
+        :return: Identifiers of the submitted tasks.
+        """
+        overrides_json = json.dumps(overrides or {}, sort_keys=True)
+        base_seed = random.getrandbits(32) if seed is None else seed
+        task_ids = []
+        with self._transaction() as connection:
+            for iteration in range(1, iterations + 1):
+                task_id = f"{name}|{overrides_json}|{iteration}"
+                connection.execute(
+                    "INSERT OR IGNORE INTO tasks (task_id, name, setup, overrides, iteration, seed, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (task_id, name, json.dumps(setup), overrides_json, iteration,
+                     random.Random(f"{base_seed}|{task_id}").getrandbits(32), PENDING)
+                )
+                task_ids.append(task_id)
+        return task_ids
+
+    def claim(self, worker: str) -> Optional[Task]:
+        """
+        Lease the next pending or expired task to a worker.
+
+        :param worker: Identifier of the claiming worker.
+        :return: The claimed task, or None if nothing is available.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            # Expired leases of tasks without attempts left are given up
+            connection.execute(
+                "UPDATE tasks SET status = ?, lease_expires = NULL, error = 'lease expired' "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, LEASED, now, self.max_attempts)
+            )
+            row = connection.execute(
+                "SELECT task_id, name, setup, overrides, iteration, seed FROM tasks "
+                "WHERE (status = ? OR (status = ? AND lease_expires < ?)) AND attempts < ? "
+                "ORDER BY rowid LIMIT 1",
+                (PENDING, LEASED, now, self.max_attempts)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE tasks SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE task_id = ?",
+                (LEASED, worker, now + self.lease_seconds, row[0])
+            )
+        task_id, name, setup, overrides, iteration, seed = row
+        return Task(task_id, name, json.loads(setup), json.loads(overrides), iteration, seed)
+
+    def complete(self, task: Task, worker: str, result: Dict) -> bool:
+        """
+        Store the result of a task.
+
+        :param task: The finished task.
+        :param worker: Identifier of the worker.
+        :param result: Result dictionary of the replication.
+        :return: True if the result was stored, False if the task already had one.
+        """
+        with self._transaction() as connection:
+            stored = connection.execute(
+                "INSERT OR IGNORE INTO results (task_id, worker, finished_at, result) VALUES (?, ?, ?, ?)",
+                (task.task_id, worker, time.time(), json.dumps(result, default=float))
+            ).rowcount == 1
+            connection.execute(
+                "UPDATE tasks SET status = ?, lease_expires = NULL, error = NULL WHERE task_id = ?",
+                (DONE, task.task_id)
+            )
+        return stored
+
+    def fail(self, task: Task, worker: str, error: str) -> bool:
+        """
+        Release a task whose replication raised an error, so that it is retried.
+
+        Tasks that used up their attempts are marked as failed. Only the worker holding
+        the lease can release it; a worker whose lease expired and was claimed by
+        another worker leaves the task alone.
+
+        :param task: The failed task.
+        :param worker: Identifier of the worker.
+        :param error: Description of the error.
+        :return: True if the task was released, False if the worker no longer held its lease.
+        """
+        with self._transaction() as connection:
+            return connection.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "lease_expires = NULL, error = ? WHERE task_id = ? AND status = ? AND worker = ?",
+                (self.max_attempts, FAILED, PENDING, error, task.task_id, LEASED, worker)
+            ).rowcount == 1
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Count tasks by status.
+
+        :return: Dictionary mapping each status to its number of tasks.
+        """
+        with self._transaction(write=False) as connection:
+            rows = connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def is_finished(self) -> bool:
+        """
+        Check whether every task is done or has failed for good.
+        """
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[LEASED] == 0
+
+    def results(self) -> List[Dict]:
+        """
+        Get the stored results ordered by setup and iteration.
+
+        :return: List of result dictionaries.
+        """
+        with self._transaction(write=False) as connection:
+            rows = connection.execute(
+                "SELECT results.result FROM results JOIN tasks USING (task_id) "
+                "ORDER BY tasks.name, tasks.overrides, tasks.iteration"
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+def default_worker_id() -> str:
+    """
+    Build a worker identifier unique across hosts and processes.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(queue: WorkQueue, config_path: Path, worker: Optional[str] = None, poll_interval: float = 1.0,
+               max_tasks: Optional[int] = None) -> int:
+    """
+    Claim and run tasks until the queue is finished.
+
+    :param queue: The work queue.
+    :param config_path: Path to the configuration JSON file.
+    :param worker: Identifier of the worker, defaults to host name and process id.
+    :param poll_interval: Seconds to wait when all remaining tasks are leased by other workers.
+    :param max_tasks: Stop after this many tasks.
+    :return: Number of tasks completed by this worker.
+    """
+    worker = worker or default_worker_id()
+    completed = 0
+    while max_tasks is None or completed < max_tasks:
+        task = queue.claim(worker)
+        if task is None:
+            if queue.is_finished():
+                break
+            time.sleep(poll_interval)
+            continue
+        try:
+            logging.info(f"Worker {worker} running iteration {task.iteration} for setup {task.name}")
+            result = run_single_simulation(task.name, task.setup, task.iteration, config_path,
+                                           overrides=task.overrides, seed=task.seed)
+        except Exception as e:
+            logging.error(f"Error during iteration {task.iteration} for setup {task.name}: {e}")
+            if not queue.fail(task, worker, str(e)):
+                logging.info(f"Lease of {task.task_id} was taken over by another worker.")
+            continue
+        if not queue.complete(task, worker, result):
+            logging.info(f"Result of {task.task_id} was already stored by another worker.")
+        completed += 1
+    return completed
+
+
+def write_results(queue: WorkQueue, csv_file: Path) -> None:
+    """
+    Write the stored results to a CSV file in the format produced by main().
+
+    :param queue: The work queue.
+    :param csv_file: Path of the CSV file.
+    """
+    with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(queue.results())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command line entry point with "submit", "worker" and "collect" commands.
+    """
+    parser = argparse.ArgumentParser(description="Distributed simulation sweeps over a shared SQLite work queue.")
+    parser.add_argument("--db", type=Path, required=True, help="Path to the shared queue database.")
+    parser.add_argument("--lease", type=float, default=300.0, help="Lease duration of a claimed task in seconds.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Queue replications of the employee setups.")
+    submit.add_argument("--setups", default="setups.json", help="Setups file inside src/.")
+    submit.add_argument("--iterations", type=int, default=10, help="Replications per setup.")
+    submit.add_argument("--seed", type=int, default=None, help="Base seed of the sweep.")
+    submit.add_argument("--overrides", type=json.loads, default=None, help="JSON object of config overrides.")
+
+    worker = commands.add_parser("worker", help="Run queued replications.")
+    worker.add_argument("--config", type=Path, default=get_path('src', 'config.json'), help="Configuration file.")
+    worker.add_argument("--worker-id", default=None, help="Identifier of the worker.")
+    worker.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between claims when idle.")
+
+    collect = commands.add_parser("collect", help="Write stored results to CSV.")
+    collect.add_argument("--output", type=Path, default=get_path('results', 'results.csv'), help="CSV file.")
+
+    args = parser.parse_args(argv)
+    queue = WorkQueue(args.db, lease_seconds=args.lease)
+
+    if args.command == "submit":
+        setups = get_employee_setups(setups_path=args.setups)
+        for name, setup in setups.items():
+            queue.submit(name, setup, args.iterations, overrides=args.overrides, seed=args.seed)
+        logging.info(f"Queued tasks: {queue.counts()}")
+    elif args.command == "worker":
+        completed = run_worker(queue, args.config, worker=args.worker_id, poll_interval=args.poll_interval)
+        logging.info(f"Worker finished after {completed} tasks.")
+    else:
+        write_results(queue, args.output)
+        logging.info(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 import csv
 import json
 import logging
+import random
 
 from pathlib import Path
 
+import numpy as np
+
+from src.network import NetworkSimulation
 from src.simulation import Simulation
 from src.utils import plot_performance
 
@@ -55,33 +59,91 @@ def get_employee_setups(setups_path):
         return {}
 
 
-def run_simulations_with_setup(name, setup, iterations, config_path, verbose=False):
+RESULT_FIELDS = ["name", "iteration", "lambda", "mu", "num_servers", "average_waiting_time", "average_service_time"]
+
+
+def create_simulation(setup, config_path, verbose=False, overrides=None, observers=None):
+    """
+    Create the simulation engine matching a setup.
+
+    :param setup: Configuration for employees and deanery: a list of employees for a single
+                  pooled queue, or a dictionary of stations and routing for a network.
+    :param config_path: Path to the configuration JSON file.
+    :param verbose: If True, log detailed simulation output.
+    :param overrides: Configuration values replacing those from the file (e.g. "lambda", "mu").
+    :param observers: Event subscribers, defaults to the engine's statistics collector.
+    :return: A Simulation or NetworkSimulation instance.
+    """
+    simulation_class = NetworkSimulation if isinstance(setup, dict) else Simulation
+    return simulation_class(config_path=config_path, setup=setup, verbose=verbose,
+                            observers=observers, overrides=overrides)
+
+
+def build_result(name, iteration, simulation, average_waiting_time, average_service_time):
+    """
+    Build the result row of a finished replication, with the keys of RESULT_FIELDS.
+
+    :param name: Name of the simulation setup.
+    :param iteration: Number of the replication.
+    :param simulation: The finished simulation, providing the rates and the number of servers.
+    :param average_waiting_time: Average waiting time of the replication.
+    :param average_service_time: Average service time of the replication.
+    :return: Dictionary containing the results of the replication.
+    """
+    return {
+        "name": name,
+        "lambda": simulation.lambda_rate,
+        "mu": simulation.service_rate,
+        "num_servers": simulation.num_servers,
+        "iteration": iteration,
+        "average_waiting_time": average_waiting_time,
+        "average_service_time": average_service_time
+    }
+
+
+def run_single_simulation(name, setup, iteration, config_path, verbose=False, overrides=None, seed=None):
+    """
+    Run one simulation replication and return its results.
+
+    :param name: Name of the simulation setup.
+    :param setup: Configuration for employees and deanery: a list of employees for a single
+                  pooled queue, or a dictionary of stations and routing for a network.
+    :param iteration: Number of the replication, stored in the results.
+    :param config_path: Path to the configuration JSON file.
+    :param verbose: If True, log detailed simulation output.
+    :param overrides: Configuration values replacing those from the file (e.g. "lambda", "mu").
+    :param seed: Seed for the random number generators, making the replication reproducible.
+    :return: Dictionary containing the results of the replication.
+    """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    simulation = create_simulation(setup, config_path, verbose=verbose, overrides=overrides)
+    simulation.run()
+    if verbose:
+        simulation.report()
+    return build_result(name, iteration, simulation, simulation.get_average_wait_time(),
+                        simulation.get_average_service_time())
+
+
+def run_simulations_with_setup(name, setup, iterations, config_path, verbose=False, overrides=None):
     """
     Run multiple simulations for a specific setup and return the results.
 
     :param name: Name of the simulation setup.
-    :param setup: Configuration for employees and deanery.
+    :param setup: Configuration for employees and deanery: a list of employees for a single
+                  pooled queue, or a dictionary of stations and routing for a network.
     :param iterations: Number of iterations to run the simulation.
     :param config_path: Path to the configuration JSON file.
     :param verbose: If True, log detailed simulation output.
+    :param overrides: Configuration values replacing those from the file (e.g. "lambda", "mu").
     :return: List of dictionaries containing results for each iteration.
     """
     results = []
     for i in range(iterations):
         try:
             logging.info(f"Running iteration {i + 1} for setup {name}")
-            simulation = Simulation(config_path=config_path, setup=setup, verbose=verbose)
-            simulation.run()
-            results.append({
-                "name": name,
-                "lambda": simulation.lambda_rate,
-                "mu": simulation.service_rate,
-                "iteration": i + 1,
-                "average_waiting_time": simulation.get_average_wait_time(),
-                "average_service_time": simulation.get_average_service_time()
-            })
-            if verbose:
-                simulation.report()
+            results.append(run_single_simulation(name, setup, i + 1, config_path, verbose=verbose, overrides=overrides))
         except Exception as e:
             logging.error(f"Error during iteration {i + 1} for setup {name}: {e}")
             continue
@@ -110,9 +172,7 @@ def main():
         # Prepare CSV file
         csv_file = results_path.joinpath("results.csv")
         with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=[
-                "name", "iteration", "lambda", "mu", "average_waiting_time", "average_service_time"
-            ])
+            writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
             writer.writeheader()
 
             # Run simulations for each setup
@@ -0,0 +1,309 @@
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.main import run_simulations_with_setup
+
+
+# Input features of the surrogate, in column order
+FEATURES = ("lambda", "mu", "num_servers")
+
+
+def count_servers(setup: Any) -> int:
+    """
+    Count the employees of a setup.
+
+    :param setup: A list of employees or a network setup with stations.
+    :return: Number of employees.
+    """
+    if isinstance(setup, dict):
+        return sum(int(station["servers"]) for station in setup.get("stations", []))
+    return len(setup)
+
+
+class ReplicationArchive:
+    """
+    Accumulates replication results and groups them by setup and design point (lambda, mu, num_servers).
+
+    Setups are kept apart, so results of one setup never inform the design of another,
+    even when their staffing and rates coincide.
+    """
+
+    def __init__(self, target: str = "average_waiting_time") -> None:
+        """
+        :param target: Result key modelled by the surrogate.
+        """
+        self.target = target
+        self.observations: Dict[str, Dict[Tuple[float, ...], List[float]]] = defaultdict(lambda: defaultdict(list))
+
+    def add(self, results: List[Dict]) -> None:
+        """
+        Add results as returned by run_simulations_with_setup.
+
+        :param results: List of result dictionaries, each with the setup "name".
+        """
+        for result in results:
+            point = tuple(float(result[feature]) for feature in FEATURES)
+            self.observations[result["name"]][point].append(float(result[self.target]))
+
+    def __len__(self) -> int:
+        return sum(self.count(name) for name in self.observations)
+
+    def count(self, name: str) -> int:
+        """
+        Count the replications of a setup.
+
+        :param name: Setup name.
+        :return: Number of archived replications.
+        """
+        return sum(len(values) for values in self.observations.get(name, {}).values())
+
+    def design(self, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Summarize the replications of a setup as point means and the variances of those means.
+
+        Points with a single replication get the average variance of the other points.
+
+        :param name: Setup name.
+        :return: Design matrix, mean responses and noise variances.
+        """
+        observations = self.observations.get(name, {})
+        points = list(observations)
+        X = np.array(points, dtype=float).reshape(len(points), len(FEATURES))
+        values = [np.asarray(observations[point]) for point in points]
+        y = np.array([v.mean() for v in values])
+        noise = np.array([v.var(ddof=1) / len(v) if len(v) > 1 else np.nan for v in values])
+        known = noise[~np.isnan(noise)]
+        noise[np.isnan(noise)] = known.mean() if known.size else 0.0
+        return X, y, noise
+
+
+class GaussianProcessSurrogate:
+    """
+    Gaussian-process regression surrogate with a squared exponential kernel.
+
+    Inputs are scaled to the unit cube of the training design and responses are
+    standardized. The length scale and signal variance are picked from a grid by
+    maximizing the log marginal likelihood. Observation noise is given per point.
+    """
+
+    def __init__(self, length_scales: Sequence[float] = (0.1, 0.2, 0.35, 0.5, 0.75, 1.0, 2.0),
+                 signal_variances: Sequence[float] = (0.25, 1.0, 4.0), nugget: float = 1e-6) -> None:
+        """
+        :param length_scales: Candidate length scales in scaled input units.
+        :param signal_variances: Candidate kernel variances in standardized response units.
+        :param nugget: Variance added to the diagonal for numerical stability.
+        """
+        self.length_scales = length_scales
+        self.signal_variances = signal_variances
+        self.nugget = nugget
+        self.length_scale: Optional[float] = None
+        self.signal_variance: Optional[float] = None
+        self.log_marginal_likelihood: Optional[float] = None
+
+    def _scale(self, X: np.ndarray) -> np.ndarray:
+        return (np.atleast_2d(np.asarray(X, dtype=float)) - self._low) / self._span
+
+    @staticmethod
+    def _kernel(A: np.ndarray, B: np.ndarray, length_scale: float, signal_variance: float) -> np.ndarray:
+        distances = ((A[:, None, :] - B[None, :, :]) ** 2).sum(axis=-1)
+        return signal_variance * np.exp(-0.5 * distances / length_scale ** 2)
+
+    def fit(self, X: np.ndarray, y: np.ndarray, noise: Optional[np.ndarray] = None) -> "GaussianProcessSurrogate":
+        """
+        Fit the surrogate.
+
+        :param X: Design matrix, one row per point.
+        :param y: Observed responses.
+        :param noise: Variance of every observation, defaults to zero.
+        :return: The fitted surrogate.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        y = np.asarray(y, dtype=float)
+        if len(y) == 0:
+            raise ValueError("Cannot fit a surrogate without observations.")
+
+        self._low = X.min(axis=0)
+        span = X.max(axis=0) - self._low
+        self._span = np.where(span > 0, span, 1.0)
+        self._mean = y.mean()
+        self._std = y.std() if y.std() > 0 else 1.0
+
+        scaled = self._scale(X)
+        standardized = (y - self._mean) / self._std
+        noise = np.zeros(len(y)) if noise is None else np.asarray(noise, dtype=float) / self._std ** 2
+
+        best = None
+        for length_scale in self.length_scales:
+            for signal_variance in self.signal_variances:
+                K = self._kernel(scaled, scaled, length_scale, signal_variance)
+                K[np.diag_indices_from(K)] += noise + self.nugget
+                try:
+                    L = np.linalg.cholesky(K)
+                except np.linalg.LinAlgError:
+                    continue
+                alpha = np.linalg.solve(L.T, np.linalg.solve(L, standardized))
+                likelihood = (-0.5 * standardized @ alpha - np.log(np.diag(L)).sum()
+                              - 0.5 * len(y) * np.log(2 * np.pi))
+                if best is None or likelihood > best[0]:
+                    best = (likelihood, length_scale, signal_variance, L, alpha)
+
+        if best is None:
+            raise np.linalg.LinAlgError("Kernel matrix is not positive definite for any hyperparameters.")
+
+        self.log_marginal_likelihood, self.length_scale, self.signal_variance, L, self._alpha = best
+        L_inv = np.linalg.inv(L)
+        self._K_inv = L_inv.T @ L_inv
+        self._X = scaled
+        return self
+
+    def predict(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict the mean response and its standard deviation.
+
+        :param X: Points to predict at, one row per point.
+        :return: Predicted means and standard deviations.
+        """
+        if self.length_scale is None:
+            raise RuntimeError("Surrogate has not been fitted.")
+        k = self._kernel(self._scale(X), self._X, self.length_scale, self.signal_variance)
+        mean = k @ self._alpha * self._std + self._mean
+        variance = self.signal_variance - np.einsum("ij,jk,ik->i", k, self._K_inv, k)
+        return mean, np.sqrt(np.maximum(variance, 0.0)) * self._std
+
+
+class AdaptiveSampler:
+    """
+    Builds surrogates over candidate (setup, lambda, mu) points, simulating only where they are uncertain.
+
+    Every setup gets its own surrogate, fitted only to its own replications. After an
+    initial design for each setup, each step refits the surrogates and runs a batch of
+    replications at the candidate with the largest predictive standard deviation,
+    until the replication budget is spent or every candidate is within tolerance.
+    """
+
+    def __init__(self, setups: Dict[str, Any], config_path: Path, candidates: Sequence[Tuple[str, float, float]],
+                 replications: int = 5, target: str = "average_waiting_time",
+                 simulate: Optional[Callable[[str, float, float], List[Dict]]] = None) -> None:
+        """
+        :param setups: Employee setups by name, as loaded from setups.json.
+        :param config_path: Path to the configuration JSON file.
+        :param candidates: Candidate points as (setup name, lambda, mu).
+        :param replications: Replications simulated per selected point.
+        :param target: Result key modelled by the surrogates.
+        :param simulate: Function running replications for (setup name, lambda, mu),
+                         defaults to run_simulations_with_setup.
+        """
+        if not candidates:
+            raise ValueError("At least one candidate point is required.")
+        self.setups = setups
+        self.config_path = config_path
+        self.candidates = list(candidates)
+        self.replications = replications
+        self.simulate = simulate or self._simulate
+        self.archive = ReplicationArchive(target)
+        self.surrogates: Dict[str, GaussianProcessSurrogate] = {}
+        self.simulated_replications = 0
+        self._features = np.array([self._point(*candidate) for candidate in self.candidates])
+        # Candidate indices of every setup, in candidate order
+        self._setup_candidates: Dict[str, List[int]] = defaultdict(list)
+        for index, (name, _, _) in enumerate(self.candidates):
+            self._setup_candidates[name].append(index)
+
+    def _point(self, name: str, lambda_rate: float, service_rate: float) -> Tuple[float, float, float]:
+        return float(lambda_rate), float(service_rate), float(count_servers(self.setups[name]))
+
+    def _simulate(self, name: str, lambda_rate: float, service_rate: float) -> List[Dict]:
+        return run_simulations_with_setup(name, self.setups[name], self.replications, self.config_path,
+                                          overrides={"lambda": lambda_rate, "mu": service_rate})
+
+    def _sample(self, index: int) -> int:
+        name, lambda_rate, service_rate = self.candidates[index]
+        logging.info(f"Sampling setup {name} at lambda={lambda_rate}, mu={service_rate}")
+        results = self.simulate(name, lambda_rate, service_rate)
+        self.archive.add(results)
+        # Failed replications are dropped by the runner, so only returned rows count
+        self.simulated_replications += len(results)
+        return len(results)
+
+    def _initial_design(self, size: int) -> List[int]:
+        design = []
+        for name, indices in self._setup_candidates.items():
+            if self.archive.count(name):
+                continue
+            positions = np.linspace(0, len(indices) - 1, min(size, len(indices))).round().astype(int)
+            design.extend(indices[position] for position in sorted(set(positions)))
+        return design
+
+    def _fit(self) -> Dict[str, GaussianProcessSurrogate]:
+        for name in self._setup_candidates:
+            if self.archive.count(name):
+                self.surrogates.setdefault(name, GaussianProcessSurrogate()).fit(*self.archive.design(name))
+        return self.surrogates
+
+    def candidate_uncertainty(self) -> np.ndarray:
+        """
+        Get the predictive standard deviation at every candidate.
+
+        :return: Standard deviations in candidate order, infinite for setups not simulated yet.
+        """
+        std = np.full(len(self.candidates), np.inf)
+        for name, indices in self._setup_candidates.items():
+            if name in self.surrogates:
+                std[indices] = self.surrogates[name].predict(self._features[indices])[1]
+        return std
+
+    def run(self, budget: int, tolerance: float = 0.0, initial_points: int = 3) -> Dict[str, GaussianProcessSurrogate]:
+        """
+        Run adaptive sampling.
+
+        A batch of replications is only started if it fits in the remaining budget.
+
+        :param budget: Maximum number of replications to simulate in this call.
+        :param tolerance: Stop once the largest predictive standard deviation is below it.
+        :param initial_points: Candidates simulated up front for every setup without replications.
+        :return: The fitted surrogates by setup name.
+        """
+        start = self.simulated_replications
+
+        def affordable() -> bool:
+            return self.simulated_replications - start + self.replications <= budget
+
+        if not len(self.archive) and not affordable():
+            raise ValueError(f"A budget of {budget} replications cannot fit a single batch of "
+                             f"{self.replications} on an empty archive.")
+        for index in self._initial_design(initial_points):
+            if not affordable():
+                break
+            self._sample(index)
+        if not len(self.archive):
+            raise RuntimeError("Every replication of the initial design failed.")
+
+        while affordable():
+            self._fit()
+            std = self.candidate_uncertainty()
+            index = int(np.argmax(std))
+            if std[index] <= tolerance:
+                break
+            if not self._sample(index):
+                logging.error(f"Every replication at candidate {self.candidates[index]} failed, stopping.")
+                break
+
+        return self._fit()
+
+    def query(self, name: str, lambda_rate: float, service_rate: float) -> Tuple[float, float]:
+        """
+        Answer a what-if question from the surrogate of a setup without simulating.
+
+        :param name: Setup name.
+        :param lambda_rate: Arrival rate.
+        :param service_rate: Service rate.
+        :return: Predicted mean of the target and its standard deviation.
+        """
+        if name not in self.surrogates:
+            raise RuntimeError(f"Setup {name} has no simulated replications to answer from.")
+        mean, std = self.surrogates[name].predict(np.array([self._point(name, lambda_rate, service_rate)]))
+        return float(mean[0]), float(std[0])
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Station:
+    """
+    Represents a service window in the deanery network.
+
+    Attributes:
+        name (str): Unique name of the station (e.g., 'information', 'documents').
+        servers (int): Number of employees working at the station.
+        service_rate (float): Service rate of a single employee per minute.
+    """
+    name: str
+    servers: int
+    service_rate: float
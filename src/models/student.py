@@ -12,6 +12,7 @@ class Student:
         major (str): Student's study program (e.g., 'engineering', 'IT', 'cybersecurity').
         service_time (float): The time required to process the student's case.
         arrival_time (float): The time when the student arrives at the office.
+        station (Optional[str]): Station visited, when simulating a network of stations.
     """
     student_id: int
     case_type: str
@@ -22,6 +23,7 @@ class Student:
     service_end_time: Optional[float] = None  # Time when the service for the student ends
     queue_length_at_arrival: Optional[int] = None  # Queue length when the student arrives
     employee_id: Optional[int] = None  # ID of the employee serving the student
+    station: Optional[str] = None  # Name of the visited station in a network simulation
 
     def set_service_start_time(self, time: float) -> None:
         """
@@ -0,0 +1,444 @@
+import copy
+import logging
+import random
+from bisect import bisect_right
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count, accumulate
+from pathlib import Path
+from tabulate import tabulate
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.models.station import Station
+from src.models.student import Student
+from src.observers import SimulationObserver, StatisticsCollector
+from src.simulation import Simulation
+
+
+# Event kinds on the calendar
+ARRIVAL = 0
+DEPARTURE = 1
+
+# Routing target meaning the student leaves the deanery
+EXIT = -1
+
+# Probability slack tolerated when validating routing rows
+ROUTING_TOLERANCE = 1e-9
+
+# Per-station statistics lists, copied when cloning a simulation
+STATION_STATISTICS = (
+    "station_arrivals", "station_services", "station_wait_sum", "station_max_wait",
+    "station_max_queue", "station_queue_area", "station_busy_area", "station_last_update",
+)
+
+
+class NetworkSimulation(Simulation):
+    """
+    Simulation of the deanery as a network of stations with routed, multi-step visits.
+
+    Each student enters at a station drawn from the routing of their case type and, after
+    every service, is routed to another station or leaves. All stations share one event
+    calendar; station state is kept in lists indexed by station number.
+
+    Every visit is represented by its own Student record carrying the station name, so
+    observers and statistics see one record per service.
+    """
+
+    def __init__(self, config_path: Path, setup: Dict, verbose: bool = False,
+                 observers: Optional[List[SimulationObserver]] = None,
+                 overrides: Optional[Dict] = None) -> None:
+        """
+        Initialize the network simulation.
+
+        :param config_path: Path to the configuration JSON file.
+        :param setup: Network setup with a list of "stations" and per-case-type "routing".
+        :param verbose: If True, enables logging of events during simulation.
+        :param observers: Event subscribers. Defaults to a single StatisticsCollector.
+        :param overrides: Configuration values replacing those from the file (e.g. "lambda", "mu").
+                          An overridden "mu" scales every station rate by its ratio to the
+                          configured "mu", so stations keep their relative speeds.
+        """
+        self.config = self._load_config(config_path)
+        configured_service_rate = self.config.get("mu", 0)
+        self.config.update(overrides or {})
+        self._read_parameters()
+
+        self.stations = self._generate_stations(setup.get("stations", []), configured_service_rate)
+        if self.service_rate != configured_service_rate:
+            if configured_service_rate <= 0:
+                raise ValueError("Overriding \"mu\" of a network requires a positive configured \"mu\".")
+            scale = self.service_rate / configured_service_rate
+            for station in self.stations:
+                station.service_rate *= scale
+        self.station_index = {station.name: index for index, station in enumerate(self.stations)}
+        self.num_servers = sum(station.servers for station in self.stations)
+        self._case_index = {case_type: index for index, case_type in enumerate(self.case_types)}
+        self.routing = self._compile_routing(setup.get("routing", {}))
+
+        self.time = 0  # Current simulation time
+        self.num_in_queue = 0  # Current number of students waiting at all stations
+        self.num_arrivals = 0  # Number of students who entered the deanery
+        self.num_departures = 0  # Number of students who left the deanery
+        self.total_sojourn_time = 0.0  # Summed time in the deanery of departed students
+        self.verbose = verbose  # Logging toggle
+
+        self.observers = [StatisticsCollector()] if observers is None else list(observers)
+        # First statistics collector, backing the averages and the report
+        self.statistics = next((o for o in self.observers if isinstance(o, StatisticsCollector)), None)
+
+        num_stations = len(self.stations)
+        self.queues = [deque() for _ in range(num_stations)]  # Waiting (visit, entry time) pairs
+        # Stack of free employee ids at every station
+        self.free_employees = [list(range(station.servers, 0, -1)) for station in self.stations]
+
+        # Per-station statistics
+        self.station_arrivals = [0] * num_stations
+        self.station_services = [0] * num_stations
+        self.station_wait_sum = [0.0] * num_stations
+        self.station_max_wait = [0.0] * num_stations
+        self.station_max_queue = [0] * num_stations
+        self.station_queue_area = [0.0] * num_stations  # Time integral of the queue length
+        self.station_busy_area = [0.0] * num_stations  # Time integral of busy employees
+        self.station_last_update = [0.0] * num_stations
+
+        self._calendar: List[Tuple] = []
+        self._sequence = count()
+        self._on_arrival = self._on_service_start = self._on_service_end = self._on_queue_change = None
+        self._on_day_end = None
+
+    @staticmethod
+    def _generate_stations(stations_config: List[Dict], default_service_rate: float) -> List[Station]:
+        """
+        Generate a list of Station objects from configuration.
+
+        :param stations_config: List of station configurations.
+        :param default_service_rate: Service rate used for stations without their own "mu".
+        :return: List of Station objects.
+        """
+        try:
+            stations = [
+                Station(
+                    name=station_config["name"],
+                    servers=int(station_config["servers"]),
+                    service_rate=station_config.get("mu", default_service_rate)
+                )
+                for station_config in stations_config
+            ]
+        except KeyError as e:
+            logging.error(f"Missing key in station configuration: {e}")
+            raise
+        if not stations:
+            raise ValueError("Network setup defines no stations.")
+        return stations
+
+    def _compile_routing(self, routing_config: Dict) -> List[List[Tuple[List[float], List[int]]]]:
+        """
+        Compile per-case-type routing matrices into cumulative probability tables.
+
+        The routing of a case type maps "entry" and station names to rows of
+        {next station: probability}. Probability missing from a station row means
+        leaving the deanery; the "entry" row must sum to one. Case types without
+        their own routing use the "default" one.
+
+        :param routing_config: Routing configuration from the network setup.
+        :return: Table indexed by case type number and node number, where the entry node
+                 follows the stations, holding cumulative probabilities and target stations.
+        """
+        entry_node = len(self.stations)
+        routing = []
+        for case_type in self.case_types:
+            matrix = routing_config.get(case_type, routing_config.get("default"))
+            if matrix is None:
+                raise ValueError(f"No routing defined for case type '{case_type}'.")
+
+            rows = [([], []) for _ in range(entry_node + 1)]
+            for source, row in matrix.items():
+                try:
+                    node = entry_node if source == "entry" else self.station_index[source]
+                    targets = [self.station_index[target] for target in row]
+                except KeyError as e:
+                    logging.error(f"Unknown station in routing for case type '{case_type}': {e}")
+                    raise
+                if any(not 0 <= probability <= 1 for probability in row.values()):
+                    raise ValueError(f"Routing probabilities from '{source}' for '{case_type}' must lie in [0, 1].")
+                cumulative = list(accumulate(row.values()))
+                total = cumulative[-1] if cumulative else 0.0
+                if total > 1 + ROUTING_TOLERANCE:
+                    raise ValueError(f"Routing probabilities from '{source}' for '{case_type}' exceed 1.")
+                if node == entry_node and abs(total - 1) > ROUTING_TOLERANCE:
+                    raise ValueError(f"Entry routing for '{case_type}' must sum to 1.")
+                rows[node] = (cumulative, targets)
+
+            if not rows[entry_node][1]:
+                raise ValueError(f"No entry station defined for case type '{case_type}'.")
+            routing.append(rows)
+        return routing
+
+    def _route(self, case_index: int, node: int) -> int:
+        """
+        Draw the next station for a student.
+
+        :param case_index: Number of the student's case type.
+        :param node: Current station number, or the entry node for new arrivals.
+        :return: Number of the next station or EXIT.
+        """
+        cumulative, targets = self.routing[case_index][node]
+        position = bisect_right(cumulative, random.random())
+        return targets[position] if position < len(targets) else EXIT
+
+    def _update_station_areas(self, station: int) -> None:
+        """
+        Accumulate the queue length and busy employees integrals of a station up to now.
+
+        :param station: Station number.
+        """
+        elapsed = self.time - self.station_last_update[station]
+        if elapsed > 0:
+            self.station_queue_area[station] += len(self.queues[station]) * elapsed
+            busy = self.stations[station].servers - len(self.free_employees[station])
+            self.station_busy_area[station] += busy * elapsed
+            self.station_last_update[station] = self.time
+
+    def _enter_station(self, station: int, student_id: int, case_type: str, major: str,
+                       entry_time: float) -> None:
+        """
+        Let a student join the queue of a station and start service if an employee is free.
+
+        :param station: Station number.
+        :param student_id: ID of the student.
+        :param case_type: Case type of the student.
+        :param major: Major of the student.
+        :param entry_time: Time the student entered the deanery.
+        """
+        self._update_station_areas(station)
+        visit = Student(
+            student_id=student_id,
+            case_type=case_type,
+            major=major,
+            service_time=np.random.exponential(1 / self.stations[station].service_rate),
+            arrival_time=self.time,
+            station=self.stations[station].name,
+        )
+        queue = self.queues[station]
+        queue.append((visit, entry_time))
+        visit.queue_length_at_arrival = len(queue)
+        self.num_in_queue += 1
+
+        self.station_arrivals[station] += 1
+        if len(queue) > self.station_max_queue[station]:
+            self.station_max_queue[station] = len(queue)
+
+        if self._on_arrival is not None:
+            self._on_arrival(self, visit)
+        if self._on_queue_change is not None:
+            self._on_queue_change(self, self.num_in_queue)
+
+        if self.free_employees[station]:
+            self._start_service(station)
+
+    def _start_service(self, station: int) -> None:
+        """
+        Start serving the first student waiting at a station.
+
+        :param station: Station number.
+        """
+        visit, entry_time = self.queues[station].popleft()
+        self.num_in_queue -= 1
+        if self._on_queue_change is not None:
+            self._on_queue_change(self, self.num_in_queue)
+
+        visit.employee_id = self.free_employees[station].pop()
+        visit.set_service_start_time(self.time)
+        visit.set_service_end_time(self.time + visit.service_time)
+
+        wait = self.time - visit.arrival_time
+        self.station_services[station] += 1
+        self.station_wait_sum[station] += wait
+        if wait > self.station_max_wait[station]:
+            self.station_max_wait[station] = wait
+
+        heappush(self._calendar, (visit.service_end_time, next(self._sequence), DEPARTURE, station, visit, entry_time))
+
+        if self._on_service_start is not None:
+            self._on_service_start(self, visit)
+
+    def _finish_service(self, station: int, visit: Student, entry_time: float) -> None:
+        """
+        Release the employee of a finished visit and route the student onwards.
+
+        :param station: Station number.
+        :param visit: The finished visit.
+        :param entry_time: Time the student entered the deanery.
+        """
+        self._update_station_areas(station)
+        self.free_employees[station].append(visit.employee_id)
+
+        if self._on_service_end is not None:
+            self._on_service_end(self, visit)
+
+        if self.queues[station]:
+            self._start_service(station)
+
+        next_station = self._route(self._case_index[visit.case_type], station)
+        if next_station == EXIT:
+            self.num_departures += 1
+            self.total_sojourn_time += self.time - entry_time
+        else:
+            self._enter_station(next_station, visit.student_id, visit.case_type, visit.major, entry_time)
+
+    def _generate_arrival(self) -> None:
+        """
+        Generate a new student entering the deanery at the current time.
+        """
+        case_type = random.choices(self.case_types, k=1)[0]
+        major = random.choices(
+            list(self.majors_distribution.keys()),
+            weights=list(self.majors_distribution.values()),
+            k=1
+        )[0]
+        self.num_arrivals += 1
+        station = self._route(self._case_index[case_type], len(self.stations))
+        self._enter_station(station, self.num_arrivals, case_type, major, self.time)
+
+    def start(self) -> None:
+        """
+        Prepare the network simulation for stepping through events.
+        """
+        self.log("Network simulation started.", level="info")
+        self._compile_hooks()
+        self._closing_time = self.opening_hours * 60
+        heappush(self._calendar, (self.get_next_arrival(), next(self._sequence), ARRIVAL, EXIT, None, 0.0))
+
+    def step(self) -> bool:
+        """
+        Process the next event on the calendar.
+
+        :return: False once the next event falls after closing time and no event was processed.
+        """
+        calendar = self._calendar
+        if not calendar or calendar[0][0] >= self._closing_time:
+            return False
+
+        event_time, _, kind, station, visit, entry_time = heappop(calendar)
+        self.time = event_time
+        if kind == ARRIVAL:
+            heappush(calendar, (self.time + self.get_next_arrival(), next(self._sequence), ARRIVAL, EXIT, None, 0.0))
+            self._generate_arrival()
+        else:
+            self._finish_service(station, visit, entry_time)
+        return True
+
+    def finish(self) -> None:
+        """
+        Close the time integrals at the end of the day and notify observers.
+        """
+        self.time = max(self.time, self._closing_time)
+        for station in range(len(self.stations)):
+            self._update_station_areas(station)
+
+        if self._on_day_end is not None:
+            self._on_day_end(self)
+
+        self.log("Network simulation ended.", level="info")
+
+    def run(self):
+        """
+        Run the network simulation by processing the shared event calendar until closing time.
+        """
+        try:
+            self.start()
+            while self.step():
+                pass
+            self.finish()
+
+        except Exception as e:
+            logging.error(f"Unexpected error during network simulation: {e}")
+            raise
+
+    def clone(self) -> "NetworkSimulation":
+        """
+        Copy the network simulation mid-run, so that the copy can continue independently.
+
+        Station queues, visits in service, the event calendar, per-station statistics and
+        observers are copied; the configuration, stations and routing are shared. Random
+        draws continue from the global generators.
+
+        :return: The copy of the simulation.
+        """
+        twin = copy.copy(self)
+        memo = {}
+        twin.observers = copy.deepcopy(self.observers, memo)
+        twin.statistics = copy.deepcopy(self.statistics, memo)
+        twin.queues = [deque(copy.deepcopy(list(queue), memo)) for queue in self.queues]
+        twin._calendar = copy.deepcopy(self._calendar, memo)
+        twin._sequence = count(next(self._sequence))
+        twin.free_employees = [list(free) for free in self.free_employees]
+        for name in STATION_STATISTICS:
+            setattr(twin, name, list(getattr(self, name)))
+        if hasattr(self, "_closing_time"):
+            twin._compile_hooks()
+        return twin
+
+    def get_average_sojourn_time(self):
+        """
+        Get the average time departed students spent in the deanery.
+        """
+        return self.total_sojourn_time / self.num_departures if self.num_departures else 0
+
+    def get_station_statistics(self) -> List[Dict]:
+        """
+        Get per-station statistics of the simulation.
+
+        :return: List of dictionaries, one per station.
+        """
+        horizon = self.time if self.time > 0 else 1
+        return [
+            {
+                "station": station.name,
+                "servers": station.servers,
+                "arrivals": self.station_arrivals[index],
+                "served": self.station_services[index],
+                "average_waiting_time": (self.station_wait_sum[index] / self.station_services[index]
+                                         if self.station_services[index] else 0),
+                "max_waiting_time": self.station_max_wait[index],
+                "average_queue_length": self.station_queue_area[index] / horizon,
+                "max_queue_length": self.station_max_queue[index],
+                "utilization": self.station_busy_area[index] / (station.servers * horizon),
+            }
+            for index, station in enumerate(self.stations)
+        ]
+
+    def get_results(self):
+        """
+        Get the results of the network simulation.
+        """
+        results = super().get_results()
+        results["average_sojourn_time"] = self.get_average_sojourn_time()
+        results["stations"] = self.get_station_statistics()
+        return results
+
+    def report(self):
+        """
+        Generate a report of all visits and per-station statistics.
+        """
+        super().report()
+        try:
+            table_data = [
+                [
+                    row["station"], row["servers"], row["arrivals"], row["served"],
+                    f"{row['average_waiting_time']:.2f}", f"{row['max_waiting_time']:.2f}",
+                    f"{row['average_queue_length']:.2f}", row["max_queue_length"], f"{row['utilization']:.2%}"
+                ]
+                for row in self.get_station_statistics()
+            ]
+            headers = [
+                "Station", "Servers", "Arrivals", "Served", "Avg Wait", "Max Wait",
+                "Avg Queue", "Max Queue", "Utilization"
+            ]
+            self.log("\n" + tabulate(table_data, headers=headers, tablefmt="pretty"), level="info")
+            self.log(f"Average Sojourn Time: {self.get_average_sojourn_time():.2f} minutes", level="info")
+        except Exception as e:
+            logging.error(f"Error generating network report: {e}")
+            raise
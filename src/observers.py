@@ -0,0 +1,211 @@
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+from tabulate import tabulate
+
+from src.models.student import Student
+
+
+HOOK_NAMES = ("on_arrival", "on_service_start", "on_service_end", "on_queue_change", "on_day_end")
+
+
+class SimulationObserver:
+    """
+    Base class for simulation event subscribers.
+
+    Subclasses override only the hooks they need. Hooks left as the base no-op
+    are never registered with the engine, so they cost nothing during a run.
+    """
+
+    def on_arrival(self, simulation, student: Student) -> None:
+        """
+        Called when a student arrives and joins the queue.
+
+        :param simulation: The running simulation.
+        :param student: The arriving student.
+        """
+
+    def on_service_start(self, simulation, student: Student) -> None:
+        """
+        Called when an employee starts serving a student.
+
+        :param simulation: The running simulation.
+        :param student: The student whose service starts.
+        """
+
+    def on_service_end(self, simulation, student: Student) -> None:
+        """
+        Called when an employee finishes serving a student.
+
+        :param simulation: The running simulation.
+        :param student: The student whose service ended.
+        """
+
+    def on_queue_change(self, simulation, queue_length: int) -> None:
+        """
+        Called with the new queue length whenever it changes: after a student joins the
+        queue and after a student is taken from it into service.
+
+        :param simulation: The running simulation.
+        :param queue_length: Number of students waiting in the queue.
+        """
+
+    def on_day_end(self, simulation) -> None:
+        """
+        Called once when the deanery closes.
+
+        :param simulation: The finished simulation.
+        """
+
+
+def _fan_out(callbacks: Sequence[Callable]) -> Callable:
+    """
+    Combine several callbacks into a single callable.
+
+    :param callbacks: Callbacks to call in registration order.
+    :return: A callable forwarding its arguments to every callback.
+    """
+    def dispatch(*args):
+        for callback in callbacks:
+            callback(*args)
+    return dispatch
+
+
+def compile_hooks(observers: Sequence[SimulationObserver]) -> Dict[str, Optional[Callable]]:
+    """
+    Resolve the active hooks of the given observers once, before a run.
+
+    Only hooks overridden by an observer are registered. A hook with no subscriber
+    resolves to None, a hook with a single subscriber to its bound method.
+
+    :param observers: Observers to register.
+    :return: Dictionary mapping each hook name to a callable or None.
+    """
+    hooks = {}
+    for name in HOOK_NAMES:
+        base = getattr(SimulationObserver, name)
+        callbacks = [
+            getattr(observer, name)
+            for observer in observers
+            if getattr(type(observer), name, base) is not base
+        ]
+        if not callbacks:
+            hooks[name] = None
+        elif len(callbacks) == 1:
+            hooks[name] = callbacks[0]
+        else:
+            hooks[name] = _fan_out(callbacks)
+    return hooks
+
+
+class StatisticsCollector(SimulationObserver):
+    """
+    Collects wait times, queue length samples and served students.
+
+    Queue lengths are sampled at every arrival, after the student joins the queue, and
+    at every service completion, before the next student is taken into service. These
+    event samples back Simulation.get_average_queue_length.
+    """
+
+    def __init__(self) -> None:
+        self.finished_students: List[Student] = []  # Students whose service has started
+        self.queue_length_data: List[int] = []  # Queue length samples
+        self.wait_times: List[float] = []  # Wait time of every served student
+
+    def on_arrival(self, simulation, student: Student) -> None:
+        self.queue_length_data.append(simulation.num_in_queue)
+
+    def on_service_start(self, simulation, student: Student) -> None:
+        self.wait_times.append(student.service_start_time - student.arrival_time)
+        self.finished_students.append(student)
+
+    def on_service_end(self, simulation, student: Student) -> None:
+        self.queue_length_data.append(simulation.num_in_queue)
+
+    def report(self) -> str:
+        """
+        Tabulate all students served during the simulation.
+
+        :return: The formatted table.
+        """
+        table_data = []
+        for student in self.finished_students:
+            table_data.append([
+                student.student_id,
+                student.major,
+                student.case_type,
+                f"{student.arrival_time:.2f}",
+                f"{student.service_start_time:.2f}",
+                f"{student.service_end_time:.2f}",
+                f"{student.total_time_in_system:.2f}",
+                f"{student.waiting_time:.2f}",
+                student.employee_id,
+                student.queue_length_at_arrival
+            ])
+
+        headers = [
+            "ID", "Major", "Case Type", "Arrival Time", "Service Start Time",
+            "Service End Time", "Time of Service", "Waiting Time", "Employee ID", "Queue at Arrival"
+        ]
+        return tabulate(table_data, headers=headers, tablefmt="pretty")
+
+
+class ExtremesCollector(SimulationObserver):
+    """
+    Tracks the longest wait and the longest queue without storing samples.
+    """
+
+    def __init__(self) -> None:
+        self.max_wait_time = 0.0
+        self.max_queue_length = 0
+
+    def on_service_start(self, simulation, student: Student) -> None:
+        wait = student.service_start_time - student.arrival_time
+        if wait > self.max_wait_time:
+            self.max_wait_time = wait
+
+    def on_queue_change(self, simulation, queue_length: int) -> None:
+        if queue_length > self.max_queue_length:
+            self.max_queue_length = queue_length
+
+
+class EventTraceLogger(SimulationObserver):
+    """
+    Logs every simulation event at the given logging level.
+    """
+
+    def __init__(self, level: int = logging.INFO) -> None:
+        self.level = level
+
+    def on_arrival(self, simulation, student: Student) -> None:
+        logging.log(self.level, f"[{simulation.time:.2f}] Student {student.student_id} arrived "
+                                f"({student.case_type}, {student.major}).")
+
+    def on_service_start(self, simulation, student: Student) -> None:
+        logging.log(self.level, f"[{simulation.time:.2f}] Employee {student.employee_id} started serving "
+                                f"student {student.student_id}.")
+
+    def on_service_end(self, simulation, student: Student) -> None:
+        logging.log(self.level, f"[{simulation.time:.2f}] Employee {student.employee_id} finished serving "
+                                f"student {student.student_id}.")
+
+    def on_queue_change(self, simulation, queue_length: int) -> None:
+        logging.log(self.level, f"[{simulation.time:.2f}] Queue length updated: {queue_length} students.")
+
+
+class ProgressLogger(SimulationObserver):
+    """
+    Logs simulation progress every given number of arrivals and at the end of the day.
+    """
+
+    def __init__(self, every: int = 100) -> None:
+        self.every = every
+        self.arrivals = 0
+
+    def on_arrival(self, simulation, student: Student) -> None:
+        self.arrivals += 1
+        if self.arrivals % self.every == 0:
+            logging.info(f"{self.arrivals} arrivals processed, simulation time {simulation.time:.2f} minutes.")
+
+    def on_day_end(self, simulation) -> None:
+        logging.info(f"Day finished after {self.arrivals} arrivals.")
@@ -0,0 +1,233 @@
+import logging
+import math
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.main import create_simulation
+from src.observers import ExtremesCollector
+from src.simulation import Simulation
+
+
+# Metrics of a simulated day that importance sampling can threshold
+METRICS = ("max_wait_time", "max_queue_length")
+
+
+@dataclass
+class RareEventEstimate:
+    """
+    Estimate of the probability of a rare event with its diagnostics.
+
+    Attributes:
+        probability (float): Unbiased estimate of the probability.
+        relative_error (float): Estimated standard error divided by the probability.
+        events (int): Number of simulated events spent on the estimate.
+        samples (int): Number of simulated days (importance sampling) or trajectories per level (splitting).
+        hits (int): Number of samples reaching the event (the last level for splitting).
+        level_probabilities (List[float]): Conditional probabilities of reaching each splitting level.
+        effective_samples (Optional[float]): Effective sample size of the importance weights; far
+            below the number of hits signals a tilt so strong that few weights dominate.
+    """
+    probability: float
+    relative_error: float
+    events: int
+    samples: int
+    hits: int
+    level_probabilities: List[float] = field(default_factory=list)
+    effective_samples: Optional[float] = None
+
+    def crude_monte_carlo_samples(self) -> float:
+        """
+        Number of plain Monte Carlo days needed to reach the same relative error.
+
+        :return: Required number of days, infinite if the event was never observed.
+        """
+        if self.probability <= 0 or self.relative_error <= 0:
+            return math.inf
+        return (1 - self.probability) / (self.probability * self.relative_error ** 2)
+
+
+class TiltedSimulation(Simulation):
+    """
+    Simulation drawing interarrival and service times from exponentially tilted distributions.
+
+    Tilting an exponential distribution of rate r by theta gives an exponential of rate
+    r - theta, so the tilt is set through rate factors: the arrival rate is multiplied by
+    arrival_factor and the service rate by service_factor. The log likelihood ratio of
+    all draws against the original distributions is accumulated to reweight outcomes.
+    """
+
+    def __init__(self, config_path: Path, setup: List[Dict], arrival_factor: float = 1.0,
+                 service_factor: float = 1.0, overrides: Optional[Dict] = None, **kwargs) -> None:
+        """
+        :param config_path: Path to the configuration JSON file.
+        :param setup: List of employee configurations.
+        :param arrival_factor: Multiplier of the arrival rate under the sampling distribution.
+        :param service_factor: Multiplier of the service rate under the sampling distribution.
+        :param overrides: Configuration values replacing those from the file (e.g. "lambda", "mu").
+        """
+        super().__init__(config_path, setup, overrides=overrides, **kwargs)
+        if not self.constant_lambda:
+            raise ValueError("Importance sampling requires a constant arrival rate.")
+        if arrival_factor <= 0 or service_factor <= 0:
+            raise ValueError("Tilting factors must be positive.")
+        self.tilted_lambda_rate = self.lambda_rate * arrival_factor
+        self.tilted_service_rate = self.service_rate * service_factor
+        self.log_likelihood_ratio = 0.0
+
+    @staticmethod
+    def _log_ratio(rate: float, tilted_rate: float, sample: float) -> float:
+        return math.log(rate / tilted_rate) - (rate - tilted_rate) * sample
+
+    def _draw_service_time(self) -> float:
+        service_time = np.random.exponential(1 / self.tilted_service_rate)
+        self.log_likelihood_ratio += self._log_ratio(self.service_rate, self.tilted_service_rate, service_time)
+        return service_time
+
+    def get_next_arrival(self) -> float:
+        interarrival = np.random.exponential(1 / self.tilted_lambda_rate)
+        self.log_likelihood_ratio += self._log_ratio(self.lambda_rate, self.tilted_lambda_rate, interarrival)
+        return interarrival
+
+
+def _seed(seed: Optional[int]) -> None:
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+
+def importance_sampling(config_path: Path, setup: List[Dict], metric: str, threshold: float,
+                        replications: int = 1000, arrival_factor: float = 1.0, service_factor: float = 1.0,
+                        overrides: Optional[Dict] = None, seed: Optional[int] = None) -> RareEventEstimate:
+    """
+    Estimate the probability that a day's metric reaches a threshold by importance sampling.
+
+    With both factors equal to one this is plain Monte Carlo. Raising the arrival rate
+    or lowering the service rate makes congestion frequent, and the likelihood ratio
+    keeps the estimate unbiased. Every day stops at the first time the threshold is
+    reached, which is a stopping time, so the weight covers only the draws made up to it.
+
+    :param config_path: Path to the configuration JSON file.
+    :param setup: List of employee configurations; network setups are not supported.
+    :param metric: "max_wait_time" or "max_queue_length".
+    :param threshold: The event is the metric being greater than or equal to the threshold.
+    :param replications: Number of simulated days.
+    :param arrival_factor: Multiplier of the arrival rate under the sampling distribution.
+    :param service_factor: Multiplier of the service rate under the sampling distribution.
+    :param overrides: Configuration values replacing those from the file (e.g. "lambda", "mu").
+    :param seed: Seed for the random number generators.
+    :return: The estimate and its diagnostics.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of {METRICS}.")
+    if isinstance(setup, dict):
+        raise ValueError("Importance sampling tilts a single pooled queue; network setups are not supported.")
+    _seed(seed)
+
+    weights = np.zeros(replications)
+    events = 0
+    for i in range(replications):
+        extremes = ExtremesCollector()
+        simulation = TiltedSimulation(config_path, setup, arrival_factor=arrival_factor,
+                                      service_factor=service_factor, overrides=overrides, observers=[extremes])
+        simulation.start()
+        # The day is cut short at the first hit, so later draws do not add to the weight's variance
+        while simulation.step():
+            events += 1
+            if getattr(extremes, metric) >= threshold:
+                weights[i] = math.exp(simulation.log_likelihood_ratio)
+                break
+
+    probability = float(weights.mean())
+    standard_error = float(weights.std(ddof=1) / math.sqrt(replications)) if replications > 1 else math.inf
+    logging.info(f"Importance sampling estimate of P({metric} >= {threshold}): {probability:.3e}")
+    return RareEventEstimate(
+        probability=probability,
+        relative_error=standard_error / probability if probability > 0 else math.inf,
+        events=events,
+        samples=replications,
+        hits=int(np.count_nonzero(weights)),
+        effective_samples=float(weights.sum() ** 2 / (weights ** 2).sum()) if probability > 0 else 0.0,
+    )
+
+
+def _advance_to_level(simulation: Simulation, level: int) -> Tuple[bool, int]:
+    """
+    Step a simulation until its queue reaches a level or the deanery closes.
+
+    The queue length is the one reported to observers, tracked by the simulation's
+    only observer, an ExtremesCollector.
+
+    :return: Whether the level was reached and the number of processed events.
+    """
+    extremes = simulation.observers[0]
+    events = 0
+    while simulation.step():
+        events += 1
+        if extremes.max_queue_length >= level:
+            return True, events
+    return False, events
+
+
+def multilevel_splitting(config_path: Path, setup: List[Dict], levels: Sequence[int], trajectories: int = 100,
+                         overrides: Optional[Dict] = None, seed: Optional[int] = None) -> RareEventEstimate:
+    """
+    Estimate the probability that the queue reaches the last of the levels during a day by fixed-effort
+    multilevel splitting.
+
+    Each stage runs the given number of trajectories until the queue reaches the next level
+    or the deanery closes. Trajectories of the first stage start at opening time; later
+    stages start from clones of the engine states saved at the previous level crossing,
+    drawn uniformly. The estimate is the product of the fractions of trajectories reaching
+    each level. For network setups the queue length is the total over all stations.
+
+    :param config_path: Path to the configuration JSON file.
+    :param setup: List of employee configurations, or a network setup.
+    :param levels: Strictly increasing queue lengths, the last one defining the event.
+    :param trajectories: Number of trajectories simulated at every stage.
+    :param overrides: Configuration values replacing those from the file (e.g. "lambda", "mu").
+    :param seed: Seed for the random number generators.
+    :return: The estimate and its diagnostics.
+    """
+    if not levels or any(lower >= upper for lower, upper in zip(levels, levels[1:])):
+        raise ValueError("Splitting levels must be a non-empty, strictly increasing sequence.")
+    _seed(seed)
+
+    entrances: List[Simulation] = []
+    level_probabilities = []
+    events = 0
+    for stage, level in enumerate(levels):
+        crossings = []
+        for _ in range(trajectories):
+            if stage == 0:
+                simulation = create_simulation(setup, config_path, overrides=overrides, observers=[ExtremesCollector()])
+                simulation.start()
+            else:
+                simulation = random.choice(entrances).clone()
+            reached, stepped = _advance_to_level(simulation, level)
+            events += stepped
+            if reached:
+                crossings.append(simulation)
+
+        level_probabilities.append(len(crossings) / trajectories)
+        if not crossings:
+            logging.info(f"No trajectory reached queue length {level}.")
+            break
+        entrances = crossings
+
+    probability = float(np.prod(level_probabilities)) if len(level_probabilities) == len(levels) else 0.0
+    relative_error = (
+        math.sqrt(sum((1 - p) / (trajectories * p) for p in level_probabilities)) if probability > 0 else math.inf
+    )
+    logging.info(f"Splitting estimate of P(queue length >= {levels[-1]}): {probability:.3e}")
+    return RareEventEstimate(
+        probability=probability,
+        relative_error=relative_error,
+        events=events,
+        samples=trajectories,
+        hits=len(entrances) if probability > 0 else 0,
+        level_probabilities=level_probabilities,
+    )
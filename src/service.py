@@ -0,0 +1,396 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.main import get_employee_setups, get_path, run_single_simulation
+
+
+# Hosts the service may bind to
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# Result keys summarized for every query
+METRICS = ("average_waiting_time", "average_service_time")
+
+# Two-sided 95% Student t quantiles by degrees of freedom; larger samples use the normal quantile
+T_QUANTILES_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
+    11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093,
+    20: 2.086, 21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048,
+    29: 2.045, 30: 2.042,
+}
+
+MAX_REPLICATIONS = 1000
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class QueryError(ValueError):
+    """
+    Raised for scenario queries that cannot be answered.
+    """
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """
+    Summarize replication values with their mean and 95% confidence interval half width.
+
+    :param values: One value per replication.
+    :return: Dictionary with the mean and the half width, None for a single value.
+    """
+    count = len(values)
+    mean = float(np.mean(values)) if count else 0.0
+    if count < 2:
+        return {"mean": mean, "ci_half_width": None}
+    quantile = T_QUANTILES_95.get(count - 1, 1.96)
+    return {"mean": mean, "ci_half_width": quantile * float(np.std(values, ddof=1)) / math.sqrt(count)}
+
+
+def _is_integer(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class _Computation:
+    """
+    Replications of one scenario, broadcasting every update to all subscribers.
+    """
+
+    def __init__(self) -> None:
+        self.updates: List[Dict] = []
+        self.done = False
+        self._changed = asyncio.Condition()
+
+    async def publish(self, update: Dict, done: bool = False) -> None:
+        async with self._changed:
+            self.updates.append(update)
+            self.done = done
+            self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Dict]:
+        """
+        Yield all updates, starting with those published before subscribing.
+        """
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.updates) > position)
+                pending = self.updates[position:]
+                done = self.done
+            for update in pending:
+                yield update
+            position += len(pending)
+            if done and position == len(self.updates):
+                return
+
+
+class QueryService:
+    """
+    Local what-if query service running scenario replications on a process pool.
+
+    Identical queries arriving while a computation is in flight subscribe to it instead
+    of starting another one. Finished results are kept in an LRU cache. Every query
+    answers with newline-delimited JSON: a "partial" update after each replication and
+    a final "result".
+    """
+
+    def __init__(self, setups: Dict[str, Any], config_path: Path, executor: Optional[Executor] = None,
+                 cache_size: int = 128) -> None:
+        """
+        :param setups: Employee setups by name, as loaded from setups.json.
+        :param config_path: Path to the configuration JSON file.
+        :param executor: Executor running replications, defaults to a process pool.
+        :param cache_size: Number of finished results kept in the cache.
+        """
+        self.setups = setups
+        self.config_path = config_path
+        self.executor = executor or ProcessPoolExecutor()
+        self._owns_executor = executor is None
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self.in_flight: Dict[str, _Computation] = {}
+        self.computations_started = 0
+        self.cache_hits = 0
+        self._tasks: Set[asyncio.Task] = set()  # Running computations
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def normalize(self, query: Dict) -> Tuple[str, Dict]:
+        """
+        Validate a query and build its canonical form.
+
+        :param query: Query with "setup" and optional "lambda", "mu", "replications" and "seed".
+        :return: Cache key and the canonical query.
+        """
+        if not isinstance(query, dict):
+            raise QueryError("Query must be a JSON object.")
+        name = query.get("setup")
+        if name not in self.setups:
+            raise QueryError(f"Unknown setup: {name}")
+        canonical = {"setup": name, "replications": query.get("replications", 10), "seed": query.get("seed")}
+        if not _is_integer(canonical["replications"]) or not 1 <= canonical["replications"] <= MAX_REPLICATIONS:
+            raise QueryError(f"Replications must be an integer between 1 and {MAX_REPLICATIONS}.")
+        if canonical["seed"] is not None and (not _is_integer(canonical["seed"]) or canonical["seed"] < 0):
+            raise QueryError("Seed must be a non-negative integer.")
+        for key in ("lambda", "mu"):
+            if key in query:
+                value = query[key]
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) \
+                        or value <= 0:
+                    raise QueryError(f"{key} must be a positive, finite number.")
+                canonical[key] = float(value)
+        unknown = set(query) - {"setup", "replications", "seed", "lambda", "mu"}
+        if unknown:
+            raise QueryError(f"Unknown query fields: {sorted(unknown)}")
+        return json.dumps(canonical, sort_keys=True), canonical
+
+    async def answer(self, query: Dict) -> AsyncIterator[Dict]:
+        """
+        Answer a query, streaming partial updates and the final result.
+
+        :param query: The scenario query.
+        :return: Iterator over update dictionaries.
+        """
+        key, canonical = self.normalize(query)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            yield dict(self.cache[key], cached=True)
+            return
+
+        computation = self.in_flight.get(key)
+        if computation is None:
+            computation = self.in_flight[key] = _Computation()
+            self.computations_started += 1
+            # The event loop keeps only weak references to tasks
+            task = asyncio.create_task(self._compute(key, canonical, computation))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        async for update in computation.subscribe():
+            yield update
+
+    async def _compute(self, key: str, query: Dict, computation: _Computation) -> None:
+        """
+        Run the replications of a query on the executor and publish updates as they finish.
+        """
+        loop = asyncio.get_running_loop()
+        name, replications = query["setup"], query["replications"]
+        overrides = {field: query[field] for field in ("lambda", "mu") if field in query}
+        futures = []
+        results = []
+        try:
+            seeds = np.random.SeedSequence(query["seed"]).generate_state(replications)
+            for iteration in range(1, replications + 1):
+                futures.append(loop.run_in_executor(
+                    self.executor, run_single_simulation, name, self.setups[name], iteration,
+                    self.config_path, False, overrides, int(seeds[iteration - 1])
+                ))
+
+            for future in asyncio.as_completed(futures):
+                results.append(await future)
+                update = {
+                    "type": "partial",
+                    "query": query,
+                    "replications_done": len(results),
+                    **{metric: summarize([result[metric] for result in results]) for metric in METRICS},
+                }
+                if len(results) < replications:
+                    await computation.publish(update)
+
+            final = dict(update, type="result", cached=False)
+            self.cache[key] = final
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            await computation.publish(final, done=True)
+        except Exception as e:
+            logging.error(f"Error answering query {key}: {e}")
+            for future in futures:
+                future.cancel()
+            await computation.publish({"type": "error", "query": query, "message": str(e)}, done=True)
+        finally:
+            self.in_flight.pop(key, None)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve a single HTTP/1.1 request.
+        """
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+            if len(request_line) < 2:
+                await self._respond(writer, 400, {"error": "Malformed request line."})
+                return
+            method, path = request_line[0], request_line[1]
+
+            if path == "/health":
+                await self._respond(writer, 200, {"status": "ok"})
+            elif path == "/setups":
+                await self._respond(writer, 200, {"setups": list(self.setups)})
+            elif path == "/stats":
+                await self._respond(writer, 200, {
+                    "computations_started": self.computations_started,
+                    "cache_hits": self.cache_hits,
+                    "cached": len(self.cache),
+                    "in_flight": len(self.in_flight),
+                })
+            elif path == "/query":
+                if method != "POST":
+                    await self._respond(writer, 405, {"error": "Use POST for queries."})
+                    return
+                try:
+                    query = json.loads(body or b"null")
+                    updates = self.answer(query)
+                    first = await updates.__anext__()
+                except (json.JSONDecodeError, QueryError) as e:
+                    await self._respond(writer, 400, {"error": str(e)})
+                    return
+                await self._stream(writer, first, updates)
+            else:
+                await self._respond(writer, 404, {"error": f"Unknown path: {path}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def _stream(writer: asyncio.StreamWriter, first: Dict, updates: AsyncIterator[Dict]) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+        )
+
+        async def send(update: Dict) -> None:
+            line = json.dumps(update).encode() + b"\n"
+            writer.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            await writer.drain()
+
+        await send(first)
+        async for update in updates:
+            await send(update)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> Tuple[str, int]:
+        """
+        Start listening on a local address.
+
+        :param host: Loopback host to bind.
+        :param port: Port to bind, 0 picks a free one.
+        :return: The bound host and port.
+        """
+        if host not in LOCAL_HOSTS:
+            raise ValueError(f"The query service only binds to localhost, not {host}.")
+        self._server = await asyncio.start_server(self._handle, host, port)
+        address = self._server.sockets[0].getsockname()
+        logging.info(f"Query service listening on http://{address[0]}:{address[1]}")
+        return address[0], address[1]
+
+    async def stop(self) -> None:
+        """
+        Stop listening and shut down the owned process pool.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def request(host: str, port: int, method: str, path: str,
+                  payload: Optional[Dict] = None) -> Tuple[int, List[Dict]]:
+    """
+    Minimal HTTP client for the query service.
+
+    :param host: Service host.
+    :param port: Service port.
+    :param method: HTTP method.
+    :param path: Request path.
+    :param payload: JSON body.
+    :return: Status code and the JSON documents of the response, one per streamed line.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding") == "chunked":
+        content = b""
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                break
+            content += await reader.readexactly(size)
+            await reader.readexactly(2)
+    else:
+        content = await reader.readexactly(int(headers.get("content-length", 0)))
+    writer.close()
+    await writer.wait_closed()
+    return status, [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+async def serve(host: str, port: int, setups_path: str, cache_size: int) -> None:
+    """
+    Run the query service until interrupted.
+    """
+    service = QueryService(get_employee_setups(setups_path=setups_path), get_path('src', 'config.json'),
+                           cache_size=cache_size)
+    await service.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command line entry point of the query service.
+    """
+    parser = argparse.ArgumentParser(description="Local what-if query service for deanery simulations.")
+    parser.add_argument("--host", default="127.0.0.1", choices=LOCAL_HOSTS, help="Loopback host to bind.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to bind.")
+    parser.add_argument("--setups", default="setups.json", help="Setups file inside src/.")
+    parser.add_argument("--cache-size", type=int, default=128, help="Number of cached results.")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.setups, args.cache_size))
+    except KeyboardInterrupt:
+        logging.info("Query service stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,16 @@
+import copy
 import json
 import logging
 import random
 from queue import Queue
 from pathlib import Path
-from tabulate import tabulate
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 import numpy as np
 
 from src.models.employee import Employee
 from src.models.student import Student
+from src.observers import SimulationObserver, StatisticsCollector, compile_hooks
 
 
 class Simulation:
@@ -17,16 +18,71 @@ class Simulation:
     Main simulation class for managing the deanery system.
     """
 
-    def __init__(self, config_path: Path, setup: List[Dict], verbose: bool = False) -> None:
+    def __init__(self, config_path: Path, setup: List[Dict], verbose: bool = False,
+                 observers: Optional[List[SimulationObserver]] = None,
+                 overrides: Optional[Dict] = None) -> None:
         """
         Initialize the simulation using the configuration from a JSON file.
 
         :param config_path: Path to the configuration JSON file.
+        :param setup: List of employee configurations.
         :param verbose: If True, enables logging of events during simulation.
+        :param observers: Event subscribers. Defaults to a single StatisticsCollector;
+                          pass an empty list to run without any bookkeeping.
+        :param overrides: Configuration values replacing those from the file (e.g. "lambda", "mu").
+        """
+        self.config = self._load_config(config_path)
+        self.config.update(overrides or {})
+        self._read_parameters()
+        self.num_servers = len(setup)
+
+        self.employees = self._generate_employees(setup)
+        self.queue = Queue()  # Queue to hold waiting students
+        self.time = 0  # Current simulation time
+        self.num_in_queue = 0  # Current number of students in the queue
+        self.num_arrivals = 0  # Number of students generated so far
+        self.verbose = verbose  # Logging toggle
+
+        self.observers = [StatisticsCollector()] if observers is None else list(observers)
+        # First statistics collector, backing the averages and the report
+        self.statistics = next((o for o in self.observers if isinstance(o, StatisticsCollector)), None)
+
+        # Keep track of when employees become available and whom they serve
+        self.employee_availability = [0] * self.num_servers
+        self.students_in_service: List[Optional[Student]] = [None] * self.num_servers
+
+    @property
+    def finished_students(self) -> List[Student]:
+        """
+        Students served during the simulation, as recorded by the statistics collector.
+        """
+        return self.statistics.finished_students if self.statistics else []
+
+    @property
+    def queue_length_data(self) -> List[int]:
+        """
+        Queue length samples, as recorded by the statistics collector.
+        """
+        return self.statistics.queue_length_data if self.statistics else []
+
+    @property
+    def wait_times(self) -> List[float]:
+        """
+        Wait times of served students, as recorded by the statistics collector.
+        """
+        return self.statistics.wait_times if self.statistics else []
+
+    @staticmethod
+    def _load_config(config_path: Path) -> Dict:
+        """
+        Load the simulation configuration from a JSON file.
+
+        :param config_path: Path to the configuration JSON file.
+        :return: Dictionary with the configuration.
         """
         try:
             with open(config_path, "r") as config_file:
-                self.config = json.load(config_file)
+                return json.load(config_file)
         except FileNotFoundError as e:
             logging.error(f"Configuration file not found: {e}")
             raise
@@ -37,28 +93,19 @@ class Simulation:
             logging.error(f"Unexpected error while loading configuration: {e}")
             raise
 
+    def _read_parameters(self) -> None:
+        """
+        Read arrival, service and calendar parameters from the loaded configuration.
+        """
         self.lambda_rate = self.config.get("lambda", 0)  # Students per minute
         self.constant_lambda = self.config.get("constant_lambda", True)
         self.lambda_mean = self.config.get("lambda_mean", 0)  # Default mean of lambda
         self.lambda_sigma = self.config.get("lambda_sigma", 0)  # Default std deviation of lambda
         self.service_rate = self.config.get("mu", 0)  # Service rate per minute
-        self.num_servers = len(setup)
         self.opening_hours = self.config.get("opening_hours", 0)
         self.case_types = self.config.get("case_types", [])
         self.majors_distribution = self.config.get("majors_distribution", {})
 
-        self.employees = self._generate_employees(setup)
-        self.queue = Queue()  # Queue to hold waiting students
-        self.time = 0  # Current simulation time
-        self.num_in_queue = 0  # Current number of students in the queue
-        self.finished_students: List[Student] = []  # List to store completed students
-        self.queue_length_data = []  # For tracking queue length over time
-        self.wait_times = []  # For tracking wait times
-        self.verbose = verbose  # Logging toggle
-
-        # Keep track of when employees become available
-        self.employee_availability = [0] * self.num_servers
-
     @staticmethod
     def _generate_employees(employees_config: List[Dict]) -> List[Employee]:
         """
@@ -98,10 +145,11 @@ class Simulation:
                 weights=list(self.majors_distribution.values()),
                 k=1
             )[0]
-            service_time = np.random.exponential(1 / self.service_rate)
+            service_time = self._draw_service_time()
 
+            self.num_arrivals += 1
             return Student(
-                student_id=len(self.finished_students) + 1,
+                student_id=self.num_arrivals,
                 case_type=case_type,
                 major=major,
                 service_time=service_time,
@@ -111,6 +159,14 @@ class Simulation:
             logging.error(f"Unexpected error while generating student: {e}")
             raise
 
+    def _draw_service_time(self) -> float:
+        """
+        Draw the service time of a new student.
+
+        :return: Service time in minutes.
+        """
+        return np.random.exponential(1 / self.service_rate)
+
     def get_next_arrival(self) -> float:
         """
         Generate the next student arrival time based on a dynamically varying lambda.
@@ -151,101 +207,171 @@ class Simulation:
             elif level == "warning":
                 logging.warning(message)
 
-    def run(self):
+    def _compile_hooks(self) -> None:
         """
-        Run the simulation using a continuous time approach.
+        Resolve subscribed hooks once so unused events cost nothing in the loop.
         """
-        try:
-            self.log("Simulation started.", level="info")
-
-            # Initialize simulation variables
-            next_arrival = self.get_next_arrival()  # First student's arrival time
-            next_service_time = np.inf  # No students being served initially
-            opening_hours_in_minutes = self.opening_hours * 60
-
-            while self.time < opening_hours_in_minutes:
-                if next_arrival < next_service_time:  # Arrival happens before service ends
-                    self.time = next_arrival
-                    student = self._generate_student(self.time)
-
-                    # Add the student to the queue
-                    self.queue.put(student)
-
-                    # Record the queue length at arrival (after adding the student)
-                    student.queue_length_at_arrival = self.queue.qsize()
-
-                    # Update queue length data
-                    self.queue_length_data.append(self.queue.qsize())
-
-                    self.num_in_queue += 1
-
-                    # Schedule the next arrival
-                    next_arrival = self.time + self.get_next_arrival()
-
-                    # Check if any employee is available
-                    available_employee_time = min(self.employee_availability)
-                    if self.time >= available_employee_time:  # Employee is available
-                        # Start service for the next student
-                        next_student = self.queue.get()
-                        self.num_in_queue -= 1
-
-                        # Record wait time for the student
-                        self.wait_times.append(self.time - next_student.arrival_time)
-
-                        # Assign the student to the employee
-                        employee_index = self.employee_availability.index(available_employee_time)
-                        next_student.employee_id = employee_index + 1
-
-                        # Assign service details
-                        next_student.set_service_start_time(self.time)
-                        # service_end_time = self.time + next_student.service_time  * self.employees[employee_index].service_coefficient
-                        service_end_time = self.time + next_student.service_time
-                        next_student.set_service_end_time(service_end_time)
-
-                        # Update employee's availability
-                        # self.employee_availability[employee_index] = service_end_time * self.employees[employee_index].service_coefficient
-                        self.employee_availability[employee_index] = service_end_time
-
-                        self.finished_students.append(next_student)
-
-                else:  # Service ends before the next arrival
-                    self.time = next_service_time
+        hooks = compile_hooks(self.observers)
+        self._on_arrival = hooks["on_arrival"]
+        self._on_service_start = hooks["on_service_start"]
+        self._on_service_end = hooks["on_service_end"]
+        self._on_queue_change = hooks["on_queue_change"]
+        self._on_day_end = hooks["on_day_end"]
+
+    def start(self) -> None:
+        """
+        Prepare the simulation for stepping through events.
+        """
+        self.log("Simulation started.", level="info")
+        self._compile_hooks()
 
-                    # Update the availability of the employee who finished serving
-                    finished_employee_index = self.employee_availability.index(self.time)
-                    self.employee_availability[finished_employee_index] = self.time
+        # Initialize simulation variables
+        self._next_arrival = self.get_next_arrival()  # First student's arrival time
+        self._next_service_time = np.inf  # No students being served initially
+        self._closing_time = self.opening_hours * 60
 
-                    # Record queue length at this time
-                    self.queue_length_data.append(self.queue.qsize())
-                    # self.log(f"Queue length updated: {self.queue.qsize()} students.", level="info")
+    def step(self) -> bool:
+        """
+        Process the next event.
 
-                    # If queue is not empty, start serving the next student
-                    if not self.queue.empty():
-                        next_student = self.queue.get()
-                        self.num_in_queue -= 1
+        :return: False once the deanery is closed and no event was processed.
+        """
+        if self.time >= self._closing_time:
+            return False
+
+        if self._next_arrival < self._next_service_time:  # Arrival happens before service ends
+            self.time = self._next_arrival
+            student = self._generate_student(self.time)
+
+            # Add the student to the queue
+            self.queue.put(student)
+
+            # Record the queue length at arrival (after adding the student)
+            student.queue_length_at_arrival = self.queue.qsize()
+
+            self.num_in_queue += 1
+            if self._on_arrival is not None:
+                self._on_arrival(self, student)
+            if self._on_queue_change is not None:
+                self._on_queue_change(self, self.queue.qsize())
+
+            # Schedule the next arrival
+            self._next_arrival = self.time + self.get_next_arrival()
+
+            # Check if any employee is available
+            available_employee_time = min(self.employee_availability)
+            if self.time >= available_employee_time:  # Employee is available
+                # Start service for the next student
+                next_student = self.queue.get()
+                self.num_in_queue -= 1
+
+                # Assign the student to the employee
+                employee_index = self.employee_availability.index(available_employee_time)
+                next_student.employee_id = employee_index + 1
+
+                # Assign service details
+                next_student.set_service_start_time(self.time)
+                # service_end_time = self.time + next_student.service_time  * self.employees[employee_index].service_coefficient
+                service_end_time = self.time + next_student.service_time
+                next_student.set_service_end_time(service_end_time)
+
+                # Update employee's availability
+                # self.employee_availability[employee_index] = service_end_time * self.employees[employee_index].service_coefficient
+                self.employee_availability[employee_index] = service_end_time
+                self.students_in_service[employee_index] = next_student
+
+                # Schedule the service completion
+                self._next_service_time = min(self._next_service_time, service_end_time)
+
+                if self._on_queue_change is not None:
+                    self._on_queue_change(self, self.queue.qsize())
+                if self._on_service_start is not None:
+                    self._on_service_start(self, next_student)
+
+        else:  # Service ends before the next arrival
+            self.time = self._next_service_time
+
+            # Update the availability of the employee who finished serving
+            finished_employee_index = self.employee_availability.index(self.time)
+            self.employee_availability[finished_employee_index] = self.time
+
+            if self._on_service_end is not None:
+                self._on_service_end(self, self.students_in_service[finished_employee_index])
+            self.students_in_service[finished_employee_index] = None
+
+            # If queue is not empty, start serving the next student
+            if not self.queue.empty():
+                next_student = self.queue.get()
+                self.num_in_queue -= 1
+
+                # Service starts for the next student
+                next_student.set_service_start_time(self.time)
+                # next_student.set_service_end_time(self.time + next_student.service_time * self.employees[finished_employee_index].service_coefficient)
+                next_student.set_service_end_time(self.time + next_student.service_time)
+                next_student.employee_id = finished_employee_index + 1
+
+                # Update employee's availability
+                # self.employee_availability[finished_employee_index] = next_student.service_end_time * self.employees[finished_employee_index].service_coefficient
+                self.employee_availability[finished_employee_index] = next_student.service_end_time
+                self.students_in_service[finished_employee_index] = next_student
+
+                if self._on_queue_change is not None:
+                    self._on_queue_change(self, self.queue.qsize())
+                if self._on_service_start is not None:
+                    self._on_service_start(self, next_student)
+
+            # Next service completion among the employees still serving
+            self._next_service_time = min(
+                (end_time for end_time in self.employee_availability if end_time > self.time), default=np.inf
+            )
 
-                        # Service starts for the next student
-                        next_student.set_service_start_time(self.time)
-                        # next_student.set_service_end_time(self.time + next_student.service_time * self.employees[finished_employee_index].service_coefficient)
-                        next_student.set_service_end_time(self.time + next_student.service_time)
-                        next_student.employee_id = finished_employee_index + 1
-                        self.finished_students.append(next_student)
+        return True
 
-                        # Update employee's availability
-                        # self.employee_availability[finished_employee_index] = next_student.service_end_time * self.employees[finished_employee_index].service_coefficient
-                        self.employee_availability[finished_employee_index] = next_student.service_end_time
+    def finish(self) -> None:
+        """
+        Close the simulated day and notify observers.
+        """
+        if self._on_day_end is not None:
+            self._on_day_end(self)
 
-                        # Update next service time
-                        next_service_time = next_student.service_end_time
-                    else:
-                        next_service_time = np.inf
+        self.log("Simulation ended.", level="info")
 
-            self.log("Simulation ended.", level="info")
+    def run(self):
+        """
+        Run the simulation using a continuous time approach.
+        """
+        try:
+            self.start()
+            while self.step():
+                pass
+            self.finish()
 
         except Exception as e:
             logging.error(f"Unexpected error during simulation: {e}")
             raise
 
+    def clone(self) -> "Simulation":
+        """
+        Copy the simulation mid-run, so that the copy can continue independently.
+
+        Queue contents, employee state and observers are deep-copied; the configuration
+        and employees are shared. Random draws continue from the global generators.
+
+        :return: The copy of the simulation.
+        """
+        twin = copy.copy(self)
+        memo = {}
+        twin.observers = copy.deepcopy(self.observers, memo)
+        twin.statistics = copy.deepcopy(self.statistics, memo)
+        twin.queue = Queue()
+        for student in self.queue.queue:
+            twin.queue.put(copy.deepcopy(student, memo))
+        twin.employee_availability = list(self.employee_availability)
+        twin.students_in_service = copy.deepcopy(self.students_in_service, memo)
+        if hasattr(self, "_closing_time"):
+            twin._compile_hooks()
+        return twin
+
     def get_average_wait_time(self):
         """
         Get the average wait time for students in the simulation.
@@ -294,30 +420,14 @@ class Simulation:
         Generate a report of all students served during the simulation.
         """
         try:
-            self.log("Generating simulation report.", level="info")
+            if self.statistics is None:
+                self.log("No statistics collector registered, skipping report.", level="warning")
+                return
 
-            table_data = []
-            for student in self.finished_students:
-                table_data.append([
-                    student.student_id,
-                    student.major,
-                    student.case_type,
-                    f"{student.arrival_time:.2f}",
-                    f"{student.service_start_time:.2f}",
-                    f"{student.service_end_time:.2f}",
-                    f"{student.total_time_in_system:.2f}",
-                    f"{student.waiting_time:.2f}",
-                    student.employee_id,
-                    student.queue_length_at_arrival
-                ])
-
-            headers = [
-                "ID", "Major", "Case Type", "Arrival Time", "Service Start Time",
-                "Service End Time", "Time of Service", "Waiting Time", "Employee ID", "Queue at Arrival"
-            ]
+            self.log("Generating simulation report.", level="info")
 
             # Log the tabulated report
-            self.log("\n" + tabulate(table_data, headers=headers, tablefmt="pretty"), level="info")
+            self.log("\n" + self.statistics.report(), level="info")
             # Log average statistics
             self.log(f"Average Wait Time: {self.get_average_wait_time():.2f} minutes", level="info")
             self.log(f"Average Service Time: {self.get_average_service_time():.2f} minutes", level="info")
@@ -0,0 +1,335 @@
+import json
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from src.models.student import Student
+from src.observers import SimulationObserver
+
+
+# Fixed-width record of a served student (one visit in a network simulation)
+STUDENT_DTYPE = np.dtype([
+    ("student_id", "<i8"),
+    ("case_type", "<i2"),
+    ("major", "<i2"),
+    ("station", "<i2"),
+    ("employee_id", "<i4"),
+    ("queue_length_at_arrival", "<i4"),
+    ("arrival_time", "<f8"),
+    ("service_start_time", "<f8"),
+    ("service_end_time", "<f8"),
+    ("service_time", "<f8"),
+])
+
+# Fixed-width record of a queue length sample
+QUEUE_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("queue_length", "<i8"),
+])
+
+# Fields computed from student records
+DERIVED_FIELDS = {
+    "waiting_time": lambda records: records["service_start_time"] - records["arrival_time"],
+    "total_time_in_system": lambda records: records["service_end_time"] - records["arrival_time"],
+}
+
+STUDENTS_FILE = "students.bin"
+QUEUE_FILE = "queue.bin"
+META_FILE = "meta.json"
+
+
+class MemmapTable:
+    """
+    Append-only file of fixed-width binary records.
+
+    Appended records go to a bounded in-memory buffer. A full buffer is written in one
+    piece by growing the file and mapping only the new region with np.memmap; reads map
+    one chunk at a time, so memory use does not depend on the file size.
+    """
+
+    def __init__(self, path: Path, dtype: np.dtype, buffer_size: int = 65536) -> None:
+        """
+        :param path: Path of the data file; existing records are kept.
+        :param dtype: Structured dtype of a record.
+        :param buffer_size: Number of records buffered in memory before writing.
+        """
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype)
+        self.path.touch(exist_ok=True)
+        self._stored = os.path.getsize(self.path) // self.dtype.itemsize
+        self._buffer = np.zeros(buffer_size, dtype=self.dtype)
+        self._buffered = 0
+
+    def __len__(self) -> int:
+        return self._stored + self._buffered
+
+    def append(self, record: Tuple) -> None:
+        """
+        Append a record, writing the buffer to disk when it is full.
+
+        :param record: Values of the record fields, in dtype order.
+        """
+        self._buffer[self._buffered] = record
+        self._buffered += 1
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered records to the end of the file.
+        """
+        if not self._buffered:
+            return
+        offset = self._stored * self.dtype.itemsize
+        with open(self.path, "r+b") as file:
+            file.truncate(offset + self._buffered * self.dtype.itemsize)
+        region = np.memmap(self.path, dtype=self.dtype, mode="r+", offset=offset, shape=(self._buffered,))
+        region[:] = self._buffer[:self._buffered]
+        region.flush()
+        del region
+        self._stored += self._buffered
+        self._buffered = 0
+
+    def chunks(self, chunk_size: int = 1 << 20) -> Iterator[np.ndarray]:
+        """
+        Iterate over the stored records, mapping one chunk of the file at a time.
+
+        Buffered records are flushed first.
+
+        :param chunk_size: Number of records per chunk.
+        :return: Iterator over read-only record arrays.
+        """
+        self.flush()
+        for start in range(0, self._stored, chunk_size):
+            count = min(chunk_size, self._stored - start)
+            yield np.memmap(self.path, dtype=self.dtype, mode="r", offset=start * self.dtype.itemsize,
+                            shape=(count,))
+
+
+class TraceStore(SimulationObserver):
+    """
+    Observer writing every served student and queue length sample to memory-mapped files.
+
+    The store is a directory holding one data file per table and a metadata file with
+    the codes of case types, majors and stations. Peak memory is bounded by the buffer
+    size regardless of the simulated horizon. Register it instead of a StatisticsCollector
+    to keep long runs from holding their history in memory.
+    """
+
+    def __init__(self, directory: Path, buffer_size: int = 65536) -> None:
+        """
+        :param directory: Directory of the store, created if missing; existing records are kept.
+        :param buffer_size: Number of records of each table buffered in memory.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.students = MemmapTable(self.directory.joinpath(STUDENTS_FILE), STUDENT_DTYPE, buffer_size)
+        self.queue = MemmapTable(self.directory.joinpath(QUEUE_FILE), QUEUE_DTYPE, buffer_size)
+        self.codes: Dict[str, List[str]] = {"case_type": [], "major": [], "station": []}
+        meta_path = self.directory.joinpath(META_FILE)
+        if meta_path.exists():
+            with open(meta_path, "r", encoding="utf-8") as file:
+                self.codes.update(json.load(file)["codes"])
+        self._lookup = {name: {value: code for code, value in enumerate(values)} for name, values in self.codes.items()}
+
+    @classmethod
+    def open(cls, directory: Path) -> "TraceStore":
+        """
+        Open an existing store for analysis.
+
+        :param directory: Directory of the store.
+        :return: The store.
+        """
+        if not Path(directory).joinpath(META_FILE).exists():
+            raise FileNotFoundError(f"No trace store found in {directory}")
+        return cls(directory, buffer_size=1)
+
+    def _code(self, name: str, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        lookup = self._lookup[name]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.codes[name])
+            self.codes[name].append(value)
+        return code
+
+    def on_service_start(self, simulation, student: Student) -> None:
+        self.students.append((
+            student.student_id,
+            self._code("case_type", student.case_type),
+            self._code("major", student.major),
+            self._code("station", student.station),
+            student.employee_id,
+            student.queue_length_at_arrival,
+            student.arrival_time,
+            student.service_start_time,
+            student.service_end_time,
+            student.service_time,
+        ))
+
+    def on_queue_change(self, simulation, queue_length: int) -> None:
+        self.queue.append((simulation.time, queue_length))
+
+    def on_day_end(self, simulation) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Write buffered records and the metadata to disk.
+        """
+        self.students.flush()
+        self.queue.flush()
+        with open(self.directory.joinpath(META_FILE), "w", encoding="utf-8") as file:
+            json.dump({
+                "codes": self.codes,
+                "student_dtype": STUDENT_DTYPE.descr,
+                "queue_dtype": QUEUE_DTYPE.descr,
+            }, file, indent=2)
+
+
+def _values(records: np.ndarray, field: str) -> np.ndarray:
+    return DERIVED_FIELDS[field](records) if field in DERIVED_FIELDS else records[field]
+
+
+def streaming_summary(table: MemmapTable, field: str, chunk_size: int = 1 << 20) -> Dict[str, float]:
+    """
+    Compute count, mean, standard deviation, minimum and maximum of a field in one pass.
+
+    :param table: Table to read.
+    :param field: Record field, or one of DERIVED_FIELDS.
+    :param chunk_size: Number of records per chunk.
+    :return: Dictionary with the statistics.
+    """
+    count, mean, squares = 0, 0.0, 0.0
+    minimum, maximum = math.inf, -math.inf
+    for chunk in table.chunks(chunk_size):
+        values = _values(chunk, field).astype(np.float64)
+        chunk_count = len(values)
+        chunk_mean = float(values.mean())
+        # Merge the chunk moments into the running ones
+        delta = chunk_mean - mean
+        total = count + chunk_count
+        mean += delta * chunk_count / total
+        squares += float(((values - chunk_mean) ** 2).sum()) + delta ** 2 * count * chunk_count / total
+        count = total
+        minimum = min(minimum, float(values.min()))
+        maximum = max(maximum, float(values.max()))
+    return {
+        "count": count,
+        "mean": mean if count else 0.0,
+        "std": math.sqrt(squares / (count - 1)) if count > 1 else 0.0,
+        "min": minimum if count else 0.0,
+        "max": maximum if count else 0.0,
+    }
+
+
+def streaming_histogram(table: MemmapTable, field: str, bins: int = 100,
+                        value_range: Optional[Tuple[float, float]] = None,
+                        chunk_size: int = 1 << 20) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute a histogram of a field chunk by chunk.
+
+    :param table: Table to read.
+    :param field: Record field, or one of DERIVED_FIELDS.
+    :param bins: Number of bins.
+    :param value_range: Range of the bins, found in an extra pass if not given.
+    :param chunk_size: Number of records per chunk.
+    :return: Counts and bin edges, as returned by np.histogram.
+    """
+    if value_range is None:
+        summary = streaming_summary(table, field, chunk_size)
+        value_range = (summary["min"], summary["max"] if summary["max"] > summary["min"] else summary["min"] + 1)
+    edges = np.histogram_bin_edges([], bins=bins, range=value_range)
+    counts = np.zeros(bins, dtype=np.int64)
+    for chunk in table.chunks(chunk_size):
+        counts += np.histogram(_values(chunk, field), bins=edges)[0]
+    return counts, edges
+
+
+def streaming_percentiles(table: MemmapTable, field: str, q: Sequence[float], bins: int = 10000,
+                          chunk_size: int = 1 << 20) -> np.ndarray:
+    """
+    Approximate percentiles of a field from a fine streaming histogram.
+
+    Each result lies within one bin width, (max - min) / bins, of the exact
+    (inverted empirical distribution function) percentile.
+
+    :param table: Table to read.
+    :param field: Record field, or one of DERIVED_FIELDS.
+    :param q: Percentiles to compute, between 0 and 100.
+    :param bins: Number of histogram bins.
+    :param chunk_size: Number of records per chunk.
+    :return: The percentiles.
+    """
+    counts, edges = streaming_histogram(table, field, bins=bins, chunk_size=chunk_size)
+    total = counts.sum()
+    if not total:
+        return np.zeros(len(q))
+    cumulative = np.concatenate(([0], np.cumsum(counts))) / total
+    return np.interp(np.asarray(q) / 100, cumulative, edges)
+
+
+def time_average_queue_length(table: MemmapTable, start_time: Optional[float] = None,
+                              end_time: Optional[float] = None, chunk_size: int = 1 << 20) -> float:
+    """
+    Compute the time-weighted average of queue length samples, each holding until the next one.
+
+    The engines record a sample every time the queue length changes, so the result is
+    exact for a trace recorded from the start of the day.
+
+    :param table: Queue length table.
+    :param start_time: Time the average starts at, with an empty queue until the first
+                       sample; defaults to the first sample time.
+    :param end_time: Time the last sample holds until, defaults to the last sample time.
+    :param chunk_size: Number of records per chunk.
+    :return: The time-weighted average queue length.
+    """
+    area, first_time, last = 0.0, None, None
+    for chunk in table.chunks(chunk_size):
+        times = chunk["time"]
+        lengths = chunk["queue_length"].astype(np.float64)
+        if last is not None:
+            area += last[1] * (times[0] - last[0])
+        else:
+            first_time = float(times[0])
+        area += float((lengths[:-1] * np.diff(times)).sum())
+        last = (float(times[-1]), float(lengths[-1]))
+    if last is None:
+        return 0.0
+    start_time = first_time if start_time is None else start_time
+    end_time = last[0] if end_time is None else end_time
+    area += last[1] * (end_time - last[0])
+    duration = end_time - start_time
+    return area / duration if duration > 0 else last[1]
+
+
+def plot_trace_histogram(store: TraceStore, output_dir: Path, field: str = "waiting_time", bins: int = 100) -> None:
+    """
+    Plot the histogram of a student field from a trace store.
+
+    :param store: Trace store to read.
+    :param output_dir: Directory to save the plot image.
+    :param field: Student record field, or one of DERIVED_FIELDS.
+    :param bins: Number of bins.
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        counts, edges = streaming_histogram(store.students, field, bins=bins)
+        plt.figure(figsize=(12, 8))
+        plt.stairs(counts, edges, fill=True)
+        plt.title(f"Distribution of {field.replace('_', ' ')}")
+        plt.xlabel(f"{field.replace('_', ' ').capitalize()} (minutes)")
+        plt.ylabel("Number of students")
+        plt.grid(True)
+        plot_file = os.path.join(output_dir, f"trace_{field}_histogram.png")
+        plt.savefig(plot_file)
+        logging.info(f"Saved {field} histogram to {plot_file}")
+        plt.close()
+    except Exception as e:
+        logging.error(f"Error while plotting trace histogram: {e}")
@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+from unittest.mock import patch
+
+import numpy as np
+
+from src import aggregation
+from src.aggregation import SAMPLE_DTYPES, run_replications_shared
+from src.main import run_single_simulation
+
+
+SETUP = [{"id": 1, "case_types": ["documents"]}, {"id": 2, "case_types": ["documents"]}]
+
+
+def shared_blocks():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+class TestSharedMemoryAggregation(unittest.TestCase):
+    def setUp(self):
+        handle, self.config_path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(handle, "w") as file:
+            json.dump({
+                "opening_hours": 2,
+                "lambda": 3,
+                "mu": 2,
+                "case_types": ["documents", "information"],
+                "majors_distribution": {"engineering": 0.5, "IT": 0.5}
+            }, file)
+
+    def tearDown(self):
+        os.remove(self.config_path)
+
+    def test_results_match_sequential_runs(self):
+        with run_replications_shared("small", SETUP, 4, self.config_path, seed=11, processes=2) as results:
+            self.assertEqual([row["iteration"] for row in results.rows], [1, 2, 3, 4])
+
+            seeds = np.random.SeedSequence(11).generate_state(4)
+            for row, seed in zip(results.rows, seeds):
+                expected = run_single_simulation("small", SETUP, row["iteration"], self.config_path, seed=int(seed))
+                self.assertAlmostEqual(row["average_waiting_time"], expected["average_waiting_time"])
+                self.assertAlmostEqual(row["average_service_time"], expected["average_service_time"])
+
+            np.testing.assert_allclose(results.replication_means(),
+                                       [row["average_waiting_time"] for row in results.rows])
+
+    def test_pooled_statistics(self):
+        with run_replications_shared("small", SETUP, 3, self.config_path, seed=5, processes=2) as results:
+            counts = [results.count(key) for key in SAMPLE_DTYPES]
+            self.assertTrue(all(count > 0 for count in counts))
+
+            pooled = np.concatenate(results._samples["wait_times"])
+            self.assertAlmostEqual(results.mean(), pooled.mean())
+            self.assertEqual(results.maximum(), pooled.max())
+            np.testing.assert_allclose(results.percentiles([50, 95, 99]), np.percentile(pooled, [50, 95, 99]))
+
+    def test_close_releases_blocks(self):
+        results = run_replications_shared("small", SETUP, 2, self.config_path, seed=1, processes=1)
+        names = [block.name for block in results._blocks]
+        results.close()
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                SharedMemory(name=name)
+
+
+    def test_failed_replications_are_skipped(self):
+        before = shared_blocks()
+        broken = [{"case_types": ["documents"]}]  # Employee without "id"
+        with run_replications_shared("broken", broken, 3, self.config_path, seed=1, processes=2) as results:
+            self.assertEqual(results.rows, [])
+            self.assertEqual(results.count(), 0)
+        self.assertEqual(shared_blocks(), before)
+
+    def test_blocks_of_failed_replications_are_released(self):
+        before = shared_blocks()
+        publish = aggregation._to_shared_memory
+
+        def fail_on_queue_lengths(samples, dtype):
+            if dtype is SAMPLE_DTYPES["queue_lengths"]:
+                raise MemoryError("no space left for queue lengths")
+            return publish(samples, dtype)
+
+        # Worker processes are forked, so they inherit the patch
+        with patch("src.aggregation._to_shared_memory", fail_on_queue_lengths):
+            with run_replications_shared("small", SETUP, 2, self.config_path, seed=1, processes=2) as results:
+                self.assertEqual(results.rows, [])
+        self.assertEqual(shared_blocks(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.distributed import DONE, FAILED, LEASED, PENDING, WorkQueue, run_worker
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SETUP = [{"id": 1, "case_types": ["documents"]}, {"id": 2, "case_types": ["documents"]}]
+
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.directory.name).joinpath("queue.db")
+        self.config_path = Path(self.directory.name).joinpath("config.json")
+        with open(self.config_path, "w") as file:
+            json.dump({
+                "opening_hours": 1,
+                "lambda": 2,
+                "mu": 3,
+                "case_types": ["documents", "information"],
+                "majors_distribution": {"engineering": 0.5, "IT": 0.5}
+            }, file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_submit_is_idempotent(self):
+        queue = WorkQueue(self.db_path)
+        first = queue.submit("small", SETUP, 3, seed=1)
+        second = queue.submit("small", SETUP, 3, seed=2)
+        self.assertEqual(first, second)
+        self.assertEqual(queue.counts()[PENDING], 3)
+
+    def test_expired_lease_is_retried_and_result_stored_once(self):
+        queue = WorkQueue(self.db_path, lease_seconds=0.05)
+        queue.submit("small", SETUP, 1, seed=1)
+
+        stale = queue.claim("worker-a")
+        self.assertIsNone(queue.claim("worker-b"))  # Still leased to worker-a
+        time.sleep(0.1)
+        retried = queue.claim("worker-b")
+        self.assertEqual(retried.task_id, stale.task_id)
+        self.assertEqual(retried.seed, stale.seed)
+
+        self.assertTrue(queue.complete(retried, "worker-b", {"name": "small", "iteration": 1}))
+        self.assertFalse(queue.complete(stale, "worker-a", {"name": "small", "iteration": 1}))
+        self.assertEqual(len(queue.results()), 1)
+        self.assertTrue(queue.is_finished())
+
+    def test_stale_worker_cannot_release_taken_over_lease(self):
+        queue = WorkQueue(self.db_path, lease_seconds=0.05)
+        queue.submit("small", SETUP, 1, seed=1)
+
+        stale = queue.claim("worker-a")
+        time.sleep(0.1)
+        queue.lease_seconds = 60
+        self.assertIsNotNone(queue.claim("worker-b"))
+
+        self.assertFalse(queue.fail(stale, "worker-a", "crashed"))
+        self.assertIsNone(queue.claim("worker-c"))  # Still leased to worker-b
+        self.assertEqual(queue.counts()[LEASED], 1)
+
+    def test_failing_task_is_given_up(self):
+        queue = WorkQueue(self.db_path, max_attempts=2)
+        queue.submit("broken", [{"case_types": ["documents"]}], 1, seed=1)  # Employee without "id"
+
+        self.assertEqual(run_worker(queue, self.config_path, worker="worker-a", poll_interval=0.01), 0)
+        self.assertEqual(queue.counts()[FAILED], 1)
+        self.assertTrue(queue.is_finished())
+
+    def test_retried_replication_is_reproducible(self):
+        queue = WorkQueue(self.db_path, lease_seconds=0.05)
+        queue.submit("small", SETUP, 1, seed=1)
+        run_worker(queue, self.config_path, worker="worker-a")
+        first = queue.results()
+
+        other = WorkQueue(Path(self.directory.name).joinpath("other.db"))
+        other.submit("small", SETUP, 1, seed=1)
+        run_worker(other, self.config_path, worker="worker-b")
+        self.assertEqual(first, other.results())
+
+    def test_parallel_worker_processes(self):
+        queue = WorkQueue(self.db_path)
+        queue.submit("small", SETUP, 6, seed=7)
+        queue.submit("large", SETUP * 2, 6, seed=7)
+
+        env = dict(os.environ, PYTHONPATH=str(ROOT))
+        workers = [
+            subprocess.Popen(
+                [sys.executable, "-m", "src.distributed", "--db", str(self.db_path), "worker",
+                 "--config", str(self.config_path), "--worker-id", f"worker-{index}", "--poll-interval", "0.05"],
+                cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            for index in range(3)
+        ]
+        for worker in workers:
+            self.assertEqual(worker.wait(timeout=120), 0)
+
+        self.assertEqual(queue.counts()[DONE], 12)
+        results = queue.results()
+        self.assertEqual(len(results), 12)
+        self.assertEqual(sorted((r["name"], r["iteration"]) for r in results),
+                         sorted((name, i) for name in ("small", "large") for i in range(1, 7)))
+
+
+if __name__ == '__main__':
+    unittest.main()
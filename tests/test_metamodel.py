@@ -0,0 +1,154 @@
+import unittest
+
+import numpy as np
+
+from src.metamodel import AdaptiveSampler, GaussianProcessSurrogate, ReplicationArchive, count_servers
+
+
+def response(lambda_rate, service_rate, servers):
+    return lambda_rate / (service_rate * servers)
+
+
+class TestReplicationArchive(unittest.TestCase):
+    def test_design_groups_replications(self):
+        archive = ReplicationArchive()
+        archive.add([
+            {"name": "small", "lambda": 10, "mu": 5, "num_servers": 2, "average_waiting_time": 1.0},
+            {"name": "small", "lambda": 10, "mu": 5, "num_servers": 2, "average_waiting_time": 3.0},
+            {"name": "small", "lambda": 20, "mu": 5, "num_servers": 2, "average_waiting_time": 4.0},
+            # Same design point, different setup
+            {"name": "network", "lambda": 10, "mu": 5, "num_servers": 2, "average_waiting_time": 50.0},
+        ])
+        X, y, noise = archive.design("small")
+
+        self.assertEqual(len(archive), 4)
+        self.assertEqual(archive.count("small"), 3)
+        np.testing.assert_array_equal(X, [[10, 5, 2], [20, 5, 2]])
+        np.testing.assert_array_equal(y, [2.0, 4.0])
+        # Variance of the mean of two observations, reused for the single-replication point
+        np.testing.assert_array_almost_equal(noise, [1.0, 1.0])
+
+        X, y, _ = archive.design("network")
+        np.testing.assert_array_equal(y, [50.0])
+        self.assertEqual(archive.design("missing")[0].shape, (0, 3))
+
+    def test_count_servers(self):
+        self.assertEqual(count_servers([{"id": 1}, {"id": 2}]), 2)
+        self.assertEqual(count_servers({"stations": [{"servers": 2}, {"servers": 3}]}), 5)
+
+
+class TestGaussianProcessSurrogate(unittest.TestCase):
+    def test_interpolates_and_reports_uncertainty(self):
+        X = np.linspace(0, 10, 8)[:, None]
+        y = np.sin(X[:, 0])
+        surrogate = GaussianProcessSurrogate().fit(X, y)
+
+        mean, std = surrogate.predict(X)
+        np.testing.assert_allclose(mean, y, atol=1e-2)
+        self.assertTrue(np.all(std < 0.05))
+
+        # Uncertainty grows away from the data
+        _, far_std = surrogate.predict(np.array([[20.0]]))
+        self.assertGreater(far_std[0], std.max())
+
+    def test_predict_requires_fit(self):
+        with self.assertRaises(RuntimeError):
+            GaussianProcessSurrogate().predict(np.array([[1.0]]))
+
+
+class TestAdaptiveSampler(unittest.TestCase):
+    def setUp(self):
+        self.setups = {"small": [{"id": 1}, {"id": 2}], "large": [{"id": 1}, {"id": 2}, {"id": 3}]}
+        self.candidates = [
+            (name, lambda_rate, service_rate)
+            for name in self.setups
+            for lambda_rate in (10, 20, 30, 40)
+            for service_rate in (10, 20)
+        ]
+        self.calls = []
+        self.rng = np.random.default_rng(0)
+
+    def simulate(self, name, lambda_rate, service_rate):
+        self.calls.append((name, lambda_rate, service_rate))
+        servers = len(self.setups[name])
+        return [
+            {
+                "name": name, "lambda": lambda_rate, "mu": service_rate, "num_servers": servers,
+                "average_waiting_time": response(lambda_rate, service_rate, servers) + self.rng.normal(0, 0.01)
+            }
+            for _ in range(4)
+        ]
+
+    def test_adaptive_sampling_reduces_uncertainty(self):
+        sampler = AdaptiveSampler(self.setups, config_path=None, candidates=self.candidates,
+                                  replications=4, simulate=self.simulate)
+        sampler.run(budget=24)
+        initial_std = sampler.candidate_uncertainty()
+
+        sampler.run(budget=40)
+        final_std = sampler.candidate_uncertainty()
+
+        self.assertLess(final_std.max(), initial_std.max())
+        self.assertEqual(sampler.simulated_replications, 4 * len(self.calls))
+        mean, std = sampler.query("large", 30, 10)
+        self.assertAlmostEqual(mean, response(30, 10, 3), delta=max(3 * std, 0.1))
+
+    def test_stops_when_within_tolerance(self):
+        sampler = AdaptiveSampler(self.setups, config_path=None, candidates=self.candidates,
+                                  replications=4, simulate=self.simulate)
+        sampler.run(budget=400, tolerance=0.2)
+        # Far fewer simulations than exhausting the budget
+        self.assertLess(sampler.simulated_replications, 400)
+        self.assertLessEqual(sampler.candidate_uncertainty().max(), 0.2)
+
+    def test_setups_are_never_mixed(self):
+        # Same staffing, very different responses, as for a routed network and a pooled queue
+        setups = {"pooled": [{"id": 1}, {"id": 2}], "routed": {"stations": [{"servers": 2}]}}
+        candidates = [(name, lambda_rate, 10) for name in setups for lambda_rate in (10, 20, 30, 40)]
+
+        def simulate(name, lambda_rate, service_rate):
+            self.calls.append((name, lambda_rate, service_rate))
+            wait = lambda_rate / 20 if name == "pooled" else 100 + lambda_rate
+            return [{"name": name, "lambda": lambda_rate, "mu": service_rate, "num_servers": 2,
+                     "average_waiting_time": wait}] * 4
+
+        sampler = AdaptiveSampler(setups, config_path=None, candidates=candidates, replications=4,
+                                  simulate=simulate)
+        surrogates = sampler.run(budget=24)
+        self.assertEqual(set(surrogates), {"pooled", "routed"})
+        self.assertAlmostEqual(sampler.query("pooled", 25, 10)[0], 25 / 20, delta=0.1)
+        self.assertAlmostEqual(sampler.query("routed", 25, 10)[0], 125, delta=2)
+
+    def test_query_requires_simulations_of_the_setup(self):
+        sampler = AdaptiveSampler(self.setups, config_path=None, candidates=self.candidates[:8],
+                                  replications=4, simulate=self.simulate)
+        sampler.run(budget=12)
+        self.assertEqual({name for name, _, _ in self.calls}, {"small"})
+        with self.assertRaises(RuntimeError):
+            sampler.query("large", 30, 10)
+
+    def test_budget_is_never_exceeded(self):
+        sampler = AdaptiveSampler(self.setups, config_path=None, candidates=self.candidates,
+                                  replications=5, simulate=lambda *point: (self.simulate(*point) * 2)[:5])
+        sampler.run(budget=12)
+        # A third batch of five would overrun the budget
+        self.assertEqual(sampler.simulated_replications, 10)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_budget_too_small_for_empty_archive(self):
+        sampler = AdaptiveSampler(self.setups, config_path=None, candidates=self.candidates,
+                                  replications=4, simulate=self.simulate)
+        with self.assertRaises(ValueError):
+            sampler.run(budget=0)
+        self.assertEqual(self.calls, [])
+
+    def test_counts_only_returned_replications(self):
+        # Two of the four replications of every batch fail and are dropped by the runner
+        sampler = AdaptiveSampler(self.setups, config_path=None, candidates=self.candidates,
+                                  replications=4, simulate=lambda *point: self.simulate(*point)[:2])
+        sampler.run(budget=12)
+        self.assertEqual(sampler.simulated_replications, 2 * len(self.calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
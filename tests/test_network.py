@@ -0,0 +1,169 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.network import NetworkSimulation
+from src.observers import SimulationObserver
+
+
+class VisitRecorder(SimulationObserver):
+    def __init__(self):
+        self.stations = []
+
+    def on_service_start(self, simulation, student):
+        self.stations.append(student.station)
+
+
+class QueueLengthRecorder(SimulationObserver):
+    def __init__(self):
+        self.lengths = []
+
+    def on_queue_change(self, simulation, queue_length):
+        self.lengths.append(queue_length)
+
+
+class TestNetworkSimulation(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "opening_hours": 8,
+            "lambda": 2,
+            "mu": 5,
+            "case_types": ["documents", "information"],
+            "majors_distribution": {"engineering": 0.5, "IT": 0.5}
+        }
+        handle, self.config_path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(handle, "w") as file:
+            json.dump(self.config, file)
+
+        self.setup = {
+            "stations": [
+                {"name": "information", "servers": 1, "mu": 10},
+                {"name": "documents", "servers": 2}
+            ],
+            "routing": {
+                "documents": {
+                    "entry": {"information": 1.0},
+                    "information": {"documents": 1.0}
+                },
+                "information": {
+                    "entry": {"information": 1.0}
+                }
+            }
+        }
+        random.seed(3)
+        np.random.seed(3)
+
+    def tearDown(self):
+        os.remove(self.config_path)
+
+    def test_routing_is_followed(self):
+        recorder = VisitRecorder()
+        simulation = NetworkSimulation(config_path=self.config_path, setup=self.setup, observers=[recorder])
+        simulation.run()
+
+        information, documents = simulation.get_station_statistics()
+        # Every arrival starts at the information desk
+        self.assertEqual(information["arrivals"], simulation.num_arrivals)
+        # Only document cases continue to the documents station
+        self.assertLess(documents["arrivals"], information["served"])
+        self.assertGreater(documents["arrivals"], 0)
+        self.assertEqual(recorder.stations.count("documents"), documents["served"])
+
+    def test_station_statistics(self):
+        simulation = NetworkSimulation(config_path=self.config_path, setup=self.setup)
+        simulation.run()
+
+        information, documents = simulation.get_station_statistics()
+        # Stations without their own "mu" use the configured service rate
+        self.assertEqual(simulation.stations[1].service_rate, self.config["mu"])
+        self.assertAlmostEqual(information["utilization"], 2 / 10, delta=0.05)
+        self.assertAlmostEqual(documents["utilization"], 1 / 5 / 2, delta=0.05)
+        self.assertGreater(simulation.get_average_sojourn_time(), 0)
+        self.assertEqual(len(simulation.finished_students), information["served"] + documents["served"])
+
+    def test_queue_change_reports_every_change(self):
+        recorder = QueueLengthRecorder()
+        simulation = NetworkSimulation(config_path=self.config_path, setup=self.setup, observers=[recorder])
+        simulation.run()
+
+        steps = np.diff([0] + recorder.lengths)
+        self.assertTrue(np.all(np.abs(steps) == 1))
+        self.assertEqual(int((steps == 1).sum()), sum(simulation.station_arrivals))
+        self.assertEqual(int((steps == -1).sum()), sum(simulation.station_services))
+
+    def test_default_routing(self):
+        self.setup["routing"] = {"default": {"entry": {"documents": 1.0}}}
+        simulation = NetworkSimulation(config_path=self.config_path, setup=self.setup)
+        simulation.run()
+
+        information, documents = simulation.get_station_statistics()
+        self.assertEqual(information["arrivals"], 0)
+        self.assertEqual(documents["arrivals"], simulation.num_arrivals)
+
+    def test_service_rate_override_scales_stations(self):
+        simulation = NetworkSimulation(config_path=self.config_path, setup=self.setup, overrides={"mu": 10})
+        self.assertEqual(simulation.service_rate, 10)
+        self.assertEqual([station.service_rate for station in simulation.stations], [20, 10])
+
+        slow = NetworkSimulation(config_path=self.config_path, setup=self.setup, overrides={"mu": 2.5})
+        self.assertEqual([station.service_rate for station in slow.stations], [5, 2.5])
+
+    def test_stepping_matches_run(self):
+        stepped = NetworkSimulation(config_path=self.config_path, setup=self.setup)
+        stepped.start()
+        while stepped.step():
+            pass
+        stepped.finish()
+
+        random.seed(3)
+        np.random.seed(3)
+        run = NetworkSimulation(config_path=self.config_path, setup=self.setup)
+        run.run()
+        self.assertEqual(stepped.get_station_statistics(), run.get_station_statistics())
+        self.assertEqual(stepped.get_average_wait_time(), run.get_average_wait_time())
+
+    def test_clone_continues_independently(self):
+        simulation = NetworkSimulation(config_path=self.config_path, setup=self.setup)
+        simulation.start()
+        for _ in range(50):
+            simulation.step()
+        arrivals, served = list(simulation.station_arrivals), len(simulation.finished_students)
+
+        twin = simulation.clone()
+        while twin.step():
+            pass
+        twin.finish()
+
+        self.assertEqual(simulation.station_arrivals, arrivals)
+        self.assertEqual(len(simulation.finished_students), served)
+        self.assertGreater(len(twin.finished_students), served)
+        self.assertIsNot(twin.statistics, simulation.statistics)
+
+        # The original still holds its own calendar and can continue
+        while simulation.step():
+            pass
+        self.assertGreater(len(simulation.finished_students), served)
+
+    def test_invalid_routing(self):
+        self.setup["routing"]["documents"]["information"] = {"documents": 0.7, "information": 0.6}
+        with self.assertRaises(ValueError):
+            NetworkSimulation(config_path=self.config_path, setup=self.setup)
+
+        # Rows summing to 1 are still rejected when a probability is negative
+        self.setup["routing"]["documents"]["information"] = {"documents": 1.0}
+        self.setup["routing"]["information"]["entry"] = {"information": -0.5, "documents": 1.5}
+        with self.assertRaises(ValueError):
+            NetworkSimulation(config_path=self.config_path, setup=self.setup)
+
+    def test_unknown_station_in_routing(self):
+        self.setup["routing"]["information"]["entry"] = {"cashier": 1.0}
+        with self.assertRaises(KeyError):
+            NetworkSimulation(config_path=self.config_path, setup=self.setup)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import json
+import random
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.observers import SimulationObserver, StatisticsCollector, compile_hooks
+from src.simulation import Simulation
+
+
+CONFIG_PATH = Path(__file__).resolve().parents[1].joinpath('src', 'config.json')
+SETUPS_PATH = Path(__file__).resolve().parents[1].joinpath('src', 'setups.json')
+
+
+class ArrivalCounter(SimulationObserver):
+    def __init__(self):
+        self.arrivals = 0
+        self.days = 0
+
+    def on_arrival(self, simulation, student):
+        self.arrivals += 1
+
+    def on_day_end(self, simulation):
+        self.days += 1
+
+
+class ServiceEndRecorder(SimulationObserver):
+    def __init__(self):
+        self.arrival_times = set()
+        self.ends = []
+        self.queue_lengths = []
+
+    def on_arrival(self, simulation, student):
+        self.arrival_times.add(simulation.time)
+
+    def on_service_end(self, simulation, student):
+        self.ends.append((simulation.time, student))
+
+    def on_queue_change(self, simulation, queue_length):
+        self.queue_lengths.append((simulation.time, queue_length))
+
+
+class QueueChangeRecorder(SimulationObserver):
+    def __init__(self):
+        self.lengths = []
+        self.mismatches = 0
+
+    def on_queue_change(self, simulation, queue_length):
+        if queue_length != simulation.num_in_queue:
+            self.mismatches += 1
+        self.lengths.append(queue_length)
+
+
+class TestCompileHooks(unittest.TestCase):
+    def test_no_observers_resolve_to_none(self):
+        hooks = compile_hooks([])
+        self.assertTrue(all(hook is None for hook in hooks.values()))
+
+    def test_only_overridden_hooks_are_registered(self):
+        counter = ArrivalCounter()
+        hooks = compile_hooks([counter])
+        # A single subscriber is called directly, without a dispatch wrapper
+        self.assertEqual(hooks["on_arrival"], counter.on_arrival)
+        self.assertIsNone(hooks["on_service_start"])
+        self.assertIsNone(hooks["on_queue_change"])
+
+    def test_multiple_subscribers_are_all_called(self):
+        first, second = ArrivalCounter(), ArrivalCounter()
+        hooks = compile_hooks([first, second])
+        hooks["on_arrival"](None, None)
+        self.assertEqual((first.arrivals, second.arrivals), (1, 1))
+
+
+class TestSimulationObservers(unittest.TestCase):
+    def setUp(self):
+        with open(SETUPS_PATH, "r", encoding="utf-8") as file:
+            self.setup = json.load(file)["setup1"]
+
+    def _run(self, observers=None):
+        random.seed(7)
+        np.random.seed(7)
+        simulation = Simulation(config_path=CONFIG_PATH, setup=self.setup, observers=observers)
+        simulation.run()
+        return simulation
+
+    def test_default_collects_statistics(self):
+        simulation = self._run()
+        self.assertIsInstance(simulation.statistics, StatisticsCollector)
+        self.assertGreater(len(simulation.finished_students), 0)
+        self.assertEqual(len(simulation.wait_times), len(simulation.finished_students))
+        self.assertGreater(len(simulation.queue_length_data), 0)
+
+    def test_run_without_observers(self):
+        simulation = self._run(observers=[])
+        self.assertIsNone(simulation.statistics)
+        self.assertEqual(simulation.finished_students, [])
+        self.assertEqual(simulation.get_average_wait_time(), 0)
+        self.assertGreater(simulation.num_arrivals, 0)
+
+    def test_custom_observer_receives_events(self):
+        counter = ArrivalCounter()
+        simulation = self._run(observers=[counter, StatisticsCollector()])
+        self.assertEqual(counter.arrivals, simulation.num_arrivals)
+        self.assertEqual(counter.days, 1)
+
+    def test_service_end_fires_when_service_completes(self):
+        recorder = ServiceEndRecorder()
+        simulation = self._run(observers=[StatisticsCollector(), recorder])
+        self.assertGreater(len(recorder.ends), 0)
+        for time, student in recorder.ends:
+            self.assertEqual(time, student.service_end_time)
+        # Every started service either ended or is still running at closing time
+        still_serving = sum(student is not None for student in simulation.students_in_service)
+        self.assertEqual(len(recorder.ends) + still_serving, len(simulation.finished_students))
+
+    def test_queue_drains_between_arrivals(self):
+        recorder = ServiceEndRecorder()
+        self._run(observers=[recorder])
+        drained = [
+            (time, length) for (time, length), (_, previous) in zip(recorder.queue_lengths[1:], recorder.queue_lengths)
+            if time not in recorder.arrival_times and length <= previous
+        ]
+        self.assertGreater(len(drained), 0)
+
+    def test_queue_change_reports_every_change(self):
+        recorder = QueueChangeRecorder()
+        simulation = self._run(observers=[recorder])
+        self.assertEqual(recorder.mismatches, 0)
+        steps = np.diff([0] + recorder.lengths)
+        # One notification per student joining and per student taken into service
+        self.assertTrue(np.all(np.abs(steps) == 1))
+        self.assertEqual(int((steps == 1).sum()), simulation.num_arrivals)
+        self.assertEqual(recorder.lengths[-1], simulation.num_in_queue)
+
+    def test_observers_do_not_change_results(self):
+        default = self._run()
+        with_counter = self._run(observers=[StatisticsCollector(), ArrivalCounter()])
+        self.assertEqual(default.get_average_wait_time(), with_counter.get_average_wait_time())
+        self.assertEqual(default.get_average_queue_length(), with_counter.get_average_queue_length())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.observers import StatisticsCollector
+from src.rare_events import importance_sampling, multilevel_splitting
+from src.simulation import Simulation
+
+
+SETUP = [{"id": 1, "case_types": ["documents"]}]
+
+
+class TestRareEvents(unittest.TestCase):
+    def setUp(self):
+        handle, self.config_path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(handle, "w") as file:
+            json.dump({
+                "opening_hours": 1,
+                "lambda": 1,
+                "mu": 1.5,
+                "case_types": ["documents"],
+                "majors_distribution": {"IT": 1.0}
+            }, file)
+
+    def tearDown(self):
+        os.remove(self.config_path)
+
+    def test_clone_continues_independently(self):
+        random.seed(4)
+        np.random.seed(4)
+        simulation = Simulation(self.config_path, SETUP)
+        simulation.start()
+        for _ in range(20):
+            simulation.step()
+        time, served = simulation.time, len(simulation.finished_students)
+
+        twin = simulation.clone()
+        while twin.step():
+            pass
+
+        self.assertEqual((simulation.time, len(simulation.finished_students)), (time, served))
+        self.assertGreater(len(twin.finished_students), served)
+        self.assertIsInstance(twin.statistics, StatisticsCollector)
+        self.assertIsNot(twin.statistics, simulation.statistics)
+        self.assertIs(twin.observers[0], twin.statistics)
+
+    def test_untilted_sampling_is_crude_monte_carlo(self):
+        estimate = importance_sampling(self.config_path, SETUP, "max_queue_length", 6, replications=200, seed=1)
+        self.assertEqual(estimate.probability, estimate.hits / 200)
+        self.assertAlmostEqual(estimate.effective_samples, estimate.hits)
+
+    def test_estimators_agree(self):
+        crude = importance_sampling(self.config_path, SETUP, "max_queue_length", 10, replications=2000, seed=1)
+        tilted = importance_sampling(self.config_path, SETUP, "max_queue_length", 10, replications=500,
+                                     arrival_factor=1.2, service_factor=0.85, seed=2)
+        splitting = multilevel_splitting(self.config_path, SETUP, levels=range(2, 11), trajectories=200, seed=3)
+
+        self.assertEqual(len(splitting.level_probabilities), 9)
+        for estimate in (tilted, splitting):
+            tolerance = 4 * np.hypot(crude.probability * crude.relative_error,
+                                     estimate.probability * estimate.relative_error)
+            self.assertAlmostEqual(estimate.probability, crude.probability, delta=tolerance)
+        # Both variance reduction methods need fewer events than crude Monte Carlo for the same precision
+        for estimate in (tilted, splitting):
+            self.assertLess(estimate.events * estimate.relative_error ** 2, crude.events * crude.relative_error ** 2)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            multilevel_splitting(self.config_path, SETUP, levels=[5, 3])
+        with self.assertRaises(ValueError):
+            importance_sampling(self.config_path, SETUP, "average_wait", 1.0)
+
+    def test_network_setups(self):
+        network = {
+            "stations": [{"name": "documents", "servers": 1}],
+            "routing": {"default": {"entry": {"documents": 1.0}}}
+        }
+        estimate = multilevel_splitting(self.config_path, network, levels=[2, 4], trajectories=20, seed=1)
+        self.assertEqual(len(estimate.level_probabilities), 2)
+        with self.assertRaises(ValueError):
+            importance_sampling(self.config_path, network, "max_queue_length", 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
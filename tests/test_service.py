@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from src.main import run_single_simulation
+from src.service import QueryService, request, summarize
+
+
+SETUPS = {
+    "small": [{"id": 1, "case_types": ["documents"]}, {"id": 2, "case_types": ["documents"]}],
+}
+
+
+class TestQueryService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+        handle, self.config_path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(handle, "w") as file:
+            json.dump({
+                "opening_hours": 2,
+                "lambda": 3,
+                "mu": 2,
+                "case_types": ["documents", "information"],
+                "majors_distribution": {"engineering": 0.5, "IT": 0.5}
+            }, file)
+
+    def tearDown(self):
+        os.remove(self.config_path)
+
+    def serve(self, scenario, cache_size=8):
+        async def run():
+            service = QueryService(SETUPS, self.config_path, executor=self.executor, cache_size=cache_size)
+            host, port = await service.start(port=0)
+            try:
+                return await scenario(service, host, port)
+            finally:
+                await service.stop()
+        return asyncio.run(run())
+
+    def test_streams_partial_results_and_matches_replications(self):
+        query = {"setup": "small", "lambda": 2.5, "mu": 1.5, "replications": 4, "seed": 3}
+
+        async def scenario(service, host, port):
+            return await request(host, port, "POST", "/query", query)
+
+        status, updates = self.serve(scenario)
+        self.assertEqual(status, 200)
+        self.assertEqual([update["type"] for update in updates], ["partial"] * 3 + ["result"])
+        self.assertEqual([update["replications_done"] for update in updates], [1, 2, 3, 4])
+        self.assertIsNone(updates[0]["average_waiting_time"]["ci_half_width"])
+
+        seeds = np.random.SeedSequence(3).generate_state(4)
+        expected = [
+            run_single_simulation("small", SETUPS["small"], iteration, self.config_path,
+                                  overrides={"lambda": 2.5, "mu": 1.5}, seed=int(seeds[iteration - 1]))
+            for iteration in range(1, 5)
+        ]
+        summary = summarize([result["average_waiting_time"] for result in expected])
+        self.assertAlmostEqual(updates[-1]["average_waiting_time"]["mean"], summary["mean"])
+        self.assertAlmostEqual(updates[-1]["average_waiting_time"]["ci_half_width"], summary["ci_half_width"])
+
+    def test_concurrent_identical_queries_are_coalesced(self):
+        query = {"setup": "small", "replications": 3, "seed": 7}
+
+        async def scenario(service, host, port):
+            responses = await asyncio.gather(*(request(host, port, "POST", "/query", query) for _ in range(4)))
+            return responses, service.computations_started
+
+        responses, computations = self.serve(scenario)
+        self.assertEqual(computations, 1)
+        finals = [updates[-1] for _, updates in responses]
+        self.assertTrue(all(final == finals[0] for final in finals))
+        self.assertTrue(all(status == 200 for status, _ in responses))
+
+    def test_finished_queries_are_served_from_cache(self):
+        async def scenario(service, host, port):
+            first = await request(host, port, "POST", "/query", {"setup": "small", "replications": 2, "seed": 1})
+            # Key order does not change the query
+            second = await request(host, port, "POST", "/query", {"seed": 1, "replications": 2, "setup": "small"})
+            other = await request(host, port, "POST", "/query", {"setup": "small", "replications": 2, "seed": 2})
+            again = await request(host, port, "POST", "/query", {"setup": "small", "replications": 2, "seed": 1})
+            _, stats = await request(host, port, "GET", "/stats")
+            return first, second, again, stats[0], list(service.cache)
+
+        first, second, again, stats, cache = self.serve(scenario, cache_size=1)
+        self.assertEqual(len(second[1]), 1)
+        self.assertTrue(second[1][0]["cached"])
+        self.assertEqual(second[1][0]["average_waiting_time"], first[1][-1]["average_waiting_time"])
+        # The cache holds one result, so the other query evicted the first one
+        self.assertFalse(again[1][-1]["cached"])
+        self.assertEqual(stats["computations_started"], 3)
+        self.assertEqual(stats["cache_hits"], 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_invalid_requests(self):
+        async def scenario(service, host, port):
+            return [
+                await request(host, port, "POST", "/query", {"setup": "missing"}),
+                await request(host, port, "POST", "/query", {"setup": "small", "mu": -1}),
+                await request(host, port, "POST", "/query", {"setup": "small", "replications": 0}),
+                await request(host, port, "POST", "/query", {"setup": "small", "replications": True}),
+                await request(host, port, "POST", "/query", {"setup": "small", "seed": True}),
+                await request(host, port, "POST", "/query", {"setup": "small", "seed": -1}),
+                await request(host, port, "POST", "/query", {"setup": "small", "lambda": float("inf")}),
+                await request(host, port, "POST", "/query", {"setup": "small", "mu": float("nan")}),
+                await request(host, port, "POST", "/query", {"setup": "small", "mu": True}),
+                await request(host, port, "GET", "/query"),
+                await request(host, port, "GET", "/nothing"),
+                await request(host, port, "GET", "/setups"),
+            ]
+
+        responses = self.serve(scenario)
+        self.assertEqual([status for status, _ in responses], [400] * 9 + [405, 404, 200])
+        self.assertEqual(responses[-1][1][0]["setups"], ["small"])
+
+    def test_failed_computation_does_not_block_queries(self):
+        broken = ThreadPoolExecutor(max_workers=1)
+        broken.shutdown()
+        query = {"setup": "small", "replications": 2, "seed": 1}
+
+        async def run():
+            service = QueryService(SETUPS, self.config_path, executor=broken)
+            host, port = await service.start(port=0)
+            try:
+                responses = await asyncio.wait_for(
+                    asyncio.gather(*(request(host, port, "POST", "/query", query) for _ in range(2))), timeout=10
+                )
+                retried = await asyncio.wait_for(request(host, port, "POST", "/query", query), timeout=10)
+                return responses + [retried], service.in_flight, service.cache
+            finally:
+                await service.stop()
+
+        responses, in_flight, cache = asyncio.run(run())
+        self.assertTrue(all(updates[-1]["type"] == "error" for _, updates in responses))
+        self.assertEqual(in_flight, {})
+        self.assertEqual(len(cache), 0)
+
+    def test_only_binds_to_localhost(self):
+        service = QueryService(SETUPS, self.config_path, executor=self.executor)
+        with self.assertRaises(ValueError):
+            asyncio.run(service.start(host="0.0.0.0", port=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.network import NetworkSimulation
+from src.observers import StatisticsCollector
+from src.simulation import Simulation
+from src.trace_store import (MemmapTable, QUEUE_DTYPE, TraceStore, streaming_histogram, streaming_percentiles,
+                             streaming_summary, time_average_queue_length)
+
+
+SETUP = [{"id": 1, "case_types": ["documents"]}, {"id": 2, "case_types": ["documents"]}]
+
+
+class TestMemmapTable(unittest.TestCase):
+    def test_append_flush_and_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            table = MemmapTable(Path(directory).joinpath("queue.bin"), QUEUE_DTYPE, buffer_size=7)
+            for i in range(50):
+                table.append((float(i), i % 5))
+            self.assertEqual(len(table), 50)
+
+            chunks = list(table.chunks(chunk_size=16))
+            self.assertEqual([len(chunk) for chunk in chunks], [16, 16, 16, 2])
+            np.testing.assert_array_equal(np.concatenate([chunk["time"] for chunk in chunks]), np.arange(50.0))
+
+            # Reopening keeps the stored records
+            reopened = MemmapTable(Path(directory).joinpath("queue.bin"), QUEUE_DTYPE)
+            self.assertEqual(len(reopened), 50)
+
+    def test_time_average_spans_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            table = MemmapTable(Path(directory).joinpath("queue.bin"), QUEUE_DTYPE, buffer_size=3)
+            for time, length in [(0.0, 1), (1.0, 3), (3.0, 0), (4.0, 2)]:
+                table.append((time, length))
+            # 1 * 1 + 3 * 2 + 0 * 1 + 2 * 2 over 6 minutes
+            self.assertAlmostEqual(time_average_queue_length(table, end_time=6.0, chunk_size=2), 11 / 6)
+            # The queue is empty before the first sample
+            self.assertAlmostEqual(time_average_queue_length(table, start_time=-2.0, end_time=6.0), 11 / 8)
+
+
+class TestTraceStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config_path = Path(self.directory.name).joinpath("config.json")
+        with open(self.config_path, "w") as file:
+            json.dump({
+                "opening_hours": 4,
+                "lambda": 3,
+                "mu": 1.8,
+                "case_types": ["documents", "information"],
+                "majors_distribution": {"engineering": 0.5, "IT": 0.5}
+            }, file)
+        random.seed(9)
+        np.random.seed(9)
+        self.store_path = Path(self.directory.name).joinpath("trace")
+        self.statistics = StatisticsCollector()
+        self.simulation = Simulation(self.config_path, SETUP,
+                                     observers=[TraceStore(self.store_path, buffer_size=100), self.statistics])
+        self.simulation.run()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_records_match_in_memory_statistics(self):
+        store = TraceStore.open(self.store_path)
+        self.assertEqual(len(store.students), len(self.statistics.finished_students))
+        # One queue sample per student joining and per student taken into service
+        self.assertEqual(len(store.queue), self.simulation.num_arrivals + len(self.statistics.finished_students))
+
+        summary = streaming_summary(store.students, "waiting_time", chunk_size=128)
+        waits = np.array(self.statistics.wait_times)
+        self.assertAlmostEqual(summary["mean"], waits.mean())
+        self.assertAlmostEqual(summary["std"], waits.std(ddof=1))
+        self.assertAlmostEqual(summary["max"], waits.max())
+
+        first = self.statistics.finished_students[0]
+        record = next(store.students.chunks())[0]
+        self.assertEqual(record["student_id"], first.student_id)
+        self.assertEqual(store.codes["major"][record["major"]], first.major)
+        self.assertEqual(record["station"], -1)
+
+    def test_histogram_and_percentiles(self):
+        store = TraceStore.open(self.store_path)
+        counts, _ = streaming_histogram(store.students, "service_time", bins=20, chunk_size=100)
+        self.assertEqual(counts.sum(), len(store.students))
+
+        summary = streaming_summary(store.students, "waiting_time")
+        waits = np.array(self.statistics.wait_times)
+        percentiles = streaming_percentiles(store.students, "waiting_time", [50, 90, 99], chunk_size=100)
+        tolerance = (summary["max"] - summary["min"]) / 10000
+        np.testing.assert_allclose(percentiles, np.percentile(waits, [50, 90, 99], method="inverted_cdf"),
+                                   atol=tolerance + 1e-9)
+
+    def test_time_average_matches_network_queue_areas(self):
+        setup = {
+            "stations": [{"name": "information", "servers": 1, "mu": 4}, {"name": "documents", "servers": 2}],
+            "routing": {"default": {"entry": {"information": 0.5, "documents": 0.5},
+                                    "information": {"documents": 0.3}}}
+        }
+        store_path = Path(self.directory.name).joinpath("network")
+        simulation = NetworkSimulation(self.config_path, setup, observers=[TraceStore(store_path, buffer_size=100)])
+        simulation.run()
+
+        store = TraceStore.open(store_path)
+        expected = sum(station["average_queue_length"] for station in simulation.get_station_statistics())
+        self.assertGreater(expected, 0)
+        self.assertAlmostEqual(time_average_queue_length(store.queue, start_time=0, end_time=simulation.time),
+                               expected)
+
+    def test_open_missing_store(self):
+        with self.assertRaises(FileNotFoundError):
+            TraceStore.open(Path(self.directory.name).joinpath("missing"))
+
+
+if __name__ == '__main__':
+    unittest.main()